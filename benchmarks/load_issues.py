@@ -0,0 +1,46 @@
+"""
+Benchmark loading of a large synthetic issue tree with the previous and the current issue loader
+
+Usage: python benchmarks/load_issues.py [--issues N] [--evidences N]
+"""
+import argparse
+import tempfile
+import time
+from textile_parser import parse_textile_file, check_issue
+from reporter.issues import Issue, load_issues_with_evidences, find_issues_and_evidences, load_issue_evidence, load_evidence
+from synthetic import create_issue_tree
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def load_issues_previously(issue_dir):
+    """Load issues the way it was done before, with a second (raw) parse of each issue file"""
+    for issue, evidences in find_issues_and_evidences(issue_dir):
+        content = load_issue_evidence(issue)
+        raw_content = parse_textile_file(issue, raw=True)
+        check_issue(content)
+        loaded = Issue(content, raw_content=raw_content, path=issue)
+        loaded.content['evidences'] = [load_evidence(evidence) for evidence in evidences]
+        yield loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--issues", type=int, default=500)
+    parser.add_argument("--evidences", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as issue_dir:
+        create_issue_tree(issue_dir, args.issues, args.evidences)
+        previous = timed(lambda: list(load_issues_previously(issue_dir)))
+        load = timed(lambda: list(load_issues_with_evidences(issue_dir, workers=args.workers)))
+        print(f"Loading {args.issues} issues with {args.evidences} evidences each")
+        print(f"Previous loader (parsing each issue twice): {previous:.3f}s")
+        print(f"Current loader ({args.workers} workers): {load:.3f}s ({previous / load:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark loading, numbering and templating on a synthetic report
+
+Runs offline and does not need LaTeX. Results are stored as JSON, so runs can be compared:
+
+    python benchmarks/run.py --issues 200 --evidences 5 --output before.json
+    python benchmarks/run.py --issues 200 --evidences 5 --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from synthetic import create_report
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": times}
+
+
+def run_benchmarks(root, repeat, workers):
+    # The configuration is read from the working directory when reporter is imported
+    os.chdir(root)
+    from reporter import get_template
+    from reporter.issues import load_issues_with_evidences
+    from reporter.reporter import create_issue_dict
+    from reporter.util import template
+
+    tpl = get_template()
+    reporter = tpl.reporter_class(tpl, report_dir=root, workers=workers, use_cache=False)
+    cache_dir = reporter.cache_dir
+    issues = list(load_issues_with_evidences(reporter.issue_dir))
+    content = reporter.get_content()
+    template_dirs = [root] + [t.REPORT_TEMPLATE_DIR for t in tpl.inheritance_tree]
+
+    def clean_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def render():
+        output_dir = tempfile.mkdtemp()
+        try:
+            template(content, output_dir, template_dirs, excluded_dirs=[os.path.relpath(cache_dir, root), '.git', 'fragments'])
+        finally:
+            shutil.rmtree(output_dir)
+
+    def generate(cold):
+        if cold:
+            clean_cache()
+        cached = tpl.reporter_class(tpl, report_dir=root, workers=workers)
+        cached.generate(preprocess_only=True)
+
+    def generate_cold():
+        generate(True)
+
+    def generate_warm():
+        generate(False)
+
+    def issue_copies():
+        copies = [type(issue)(dict(issue.content), path=issue.path) for issue in issues]
+        for issue in copies:
+            issue.score()
+        return copies
+
+    # create_issue_dict numbers the issues, so each run gets its own copies, which are made before timing
+    unnumbered = [issue_copies() for _ in range(repeat)]
+
+    results = {
+        "load_issues_with_evidences": timed(lambda: list(load_issues_with_evidences(reporter.issue_dir, workers=workers)), repeat),
+        "create_issue_dict": timed(lambda: create_issue_dict(unnumbered.pop()), repeat),
+        "load_static_content": timed(tpl.load_static_content, repeat),
+        "template": timed(render, repeat),
+        "generate_preprocess_only_cold": timed(generate_cold, repeat),
+    }
+    generate_warm()
+    results["generate_preprocess_only_warm"] = timed(generate_warm, repeat)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+
+def print_results(results, compare=None):
+    print(f"{'Benchmark':<35} {'Median (s)':>12} {'Min (s)':>12}" + (f" {'Change':>10}" if compare else ""))
+    for name, result in results.items():
+        line = f"{name:<35} {result['median']:>12.4f} {result['min']:>12.4f}"
+        if compare and name in compare:
+            line += f" {result['median'] / compare[name]['median'] - 1:>+10.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=200, help="Number of issues")
+    parser.add_argument("--evidences", type=int, default=5, help="Number of evidences per issue")
+    parser.add_argument("--output-size", type=int, default=2000, help="Size of the output of each evidence in characters")
+    parser.add_argument("--depth", type=int, default=2, help="Number of templates that inherit from the default template")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times each benchmark is run")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes used to load issues")
+    parser.add_argument("--output", "-o", help="Store the results as JSON in this file")
+    parser.add_argument("--compare", "-c", help="Compare with the results in this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        root = create_report(base_dir, args.issues, args.evidences, args.output_size, args.depth)
+        results = run_benchmarks(root, args.repeat, args.workers)
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    compare = None
+    if args.compare:
+        with open(args.compare) as f:
+            compare = json.load(f)["results"]
+    print_results(results, compare)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "parameters": vars(args),
+                "revision": git_revision(),
+                "python": sys.version,
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
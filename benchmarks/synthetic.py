@@ -0,0 +1,117 @@
+"""
+Generate synthetic reports for benchmarks
+
+Only the standard library is used, so reports can be generated before reporter is imported.
+"""
+import os
+
+VECTORS = [
+    "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:C/C:H/I:H/A:H",
+    "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N",
+    "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N",
+    "CVSS:3.1/AV:N/AC:H/PR:L/UI:R/S:U/C:L/I:N/A:N",
+    "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:N/I:N/A:N",
+]
+
+ISSUE = """#[Title]#
+Synthetic issue {i}
+
+#[CVSSv3Vector]#
+{cvss_vector}
+
+#[Type]#
+External
+
+#[Description]#
+{text}
+
+#[Solution]#
+{text}
+
+#[References]#
+"""
+
+EVIDENCE = """#[Location]#
+host{i}.example.com
+
+#[Output]#
+{output}
+"""
+
+REPORTER_INI = """[report]
+language = en
+template = {template}
+title = Synthetic report
+company_name = Company B.V.
+"""
+
+REPORT_TEX = r"""\documentclass{pentest}
+
+\begin{document}
+    \input{issues.tex}
+    \input{conclusion.tex}
+\end{document}
+"""
+
+LEVEL_TEX = r"""% Synthetic template level \VAR{level_name}
+\VAR{results.title}
+"""
+
+
+def lorem(size):
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    return (text * (size // len(text) + 1))[:size]
+
+
+def create_issue_tree(issue_dir, issues, evidences, output_size=2000):
+    text = lorem(1000)
+    output = lorem(output_size)
+    for i in range(issues):
+        path = os.path.join(issue_dir, f"issue{i}")
+        os.makedirs(path)
+        with open(os.path.join(path, "issue.dradis"), 'w') as f:
+            f.write(ISSUE.format(i=i, cvss_vector=VECTORS[i % len(VECTORS)], text=text))
+        for j in range(evidences):
+            with open(os.path.join(path, f"evidence{j}.dradis"), 'w') as f:
+                f.write(EVIDENCE.format(i=j, output=output))
+
+
+def create_templates(templates_dir, depth):
+    """
+    Create a chain of depth templates that inherit from each other and finally from the default template
+
+    :return: Name of the first template, or "default" if depth is 0
+    """
+    parents = ["default"]
+    for level in reversed(range(depth)):
+        template_dir = os.path.join(templates_dir, f"level{level}")
+        os.makedirs(os.path.join(template_dir, "report"))
+        os.makedirs(os.path.join(template_dir, "static_content"))
+        with open(os.path.join(template_dir, "parents.txt"), 'w') as f:
+            # parents.txt lists all ancestors, template names are joined with the templates dir so absolute paths can be used
+            f.write("\n".join(parents))
+        with open(os.path.join(template_dir, "report", f"level{level}.tex"), 'w') as f:
+            f.write(LEVEL_TEX)
+        with open(os.path.join(template_dir, "static_content", "en.yaml"), 'w') as f:
+            f.write(f"level_name: level{level}\nlevel{level}:\n  text: {lorem(200)}\n")
+        with open(os.path.join(template_dir, "static_content", "general.yaml"), 'w') as f:
+            f.write(f"general{level}: {lorem(200)}\n")
+        parents.insert(0, template_dir)
+    return parents[0]
+
+
+def create_report(base_dir, issues=200, evidences=5, output_size=2000, depth=2):
+    """
+    Create a report in base_dir/report, with a template inheritance tree of the given depth in base_dir/templates
+
+    :return: Path of the report
+    """
+    root = os.path.join(base_dir, "report")
+    os.makedirs(os.path.join(root, "images"))
+    template = create_templates(os.path.join(base_dir, "templates"), depth)
+    with open(os.path.join(root, "reporter.ini"), 'w') as f:
+        f.write(REPORTER_INI.format(template=template))
+    with open(os.path.join(root, "report.tex"), 'w') as f:
+        f.write(REPORT_TEX)
+    create_issue_tree(os.path.join(root, "issues"), issues, evidences, output_size)
+    return root
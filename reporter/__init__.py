@@ -1,13 +1,32 @@
-from .reporter import Template
+import os
+import sys
 from .config import config
+from .client import run_in_server
+
+
+def __getattr__(name):
+    # The template machinery is imported when it is needed, so commands that are sent to `reporter serve` start fast
+    if name == "Template":
+        from .reporter import Template
+        return Template
+    raise AttributeError(name)
 
 
 def get_template():
+    from .reporter import Template
     template = Template(config.get('template'))
     return template
 
 
 def main():
+    if "_ARGCOMPLETE" in os.environ:
+        from .completers import has_commandline_override, complete
+        if not has_commandline_override(config.get('template')):
+            # Completion only needs the parser, so the template machinery is not loaded on every TAB
+            complete()
+    status = run_in_server(sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
     template = get_template()
     template.commandline.parse_args()
 
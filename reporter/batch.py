@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import REPORT_CONFIG
+
+# Runs reporter in a new process, so the configuration is read from the reporter.ini of its working directory
+WORKER_COMMAND = [sys.executable, "-c", "from reporter import main; main()", "--debug"]
+
+
+def find_report_roots(dirs):
+    """Return the report roots (directories with a reporter.ini) in or below the given directories"""
+    roots = []
+    for dir in dirs:
+        for dirpath, dnames, fnames in os.walk(dir):
+            if REPORT_CONFIG in fnames:
+                roots.append(os.path.realpath(dirpath))
+                # Reports do not contain other reports
+                dnames.clear()
+                continue
+            dnames[:] = sorted(d for d in dnames if not d.startswith('.'))
+    return list(dict.fromkeys(roots))
+
+
+def run_report(root, argv):
+    """Run reporter with the given arguments in the report root, returns a dict with the result"""
+    start = time.perf_counter()
+    process = subprocess.run(WORKER_COMMAND + argv, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    output = process.stdout.decode(errors='replace')
+    lines = [line for line in output.splitlines() if line.strip()]
+    return {
+        "root": root,
+        "status": process.returncode,
+        "time": time.perf_counter() - start,
+        "error": lines[-1] if process.returncode and lines else None,
+        "output": output,
+    }
+
+
+def batch_generate(roots, argv, parallel=1):
+    """Run reporter with the given arguments in each report root, at most parallel reports at a time"""
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        return list(executor.map(lambda root: run_report(root, argv), roots))
+
+
+def format_summary(results):
+    width = max([len("Report")] + [len(result["root"]) for result in results])
+    lines = [f"{'Report':<{width}} {'Status':<8} {'Time (s)':>10}"]
+    for result in results:
+        status = "failed" if result["status"] else "ok"
+        line = f"{result['root']:<{width}} {status:<8} {result['time']:>10.1f}"
+        if result["error"]:
+            line += f"  {result['error']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+import json
+import os
+import socket
+import sys
+from .config import config, SERVER_SOCKET
+from .util import find_report_root, ReportRootNotFound
+
+# Commands that are handled by `reporter serve` when it is running
+SERVER_COMMANDS = ["generate", "locations", "images", "diff-standard-issues"]
+
+# Separates the output of a command from its status
+STATUS_SEPARATOR = b"\0"
+
+
+def get_socket_path(root=None):
+    if not root:
+        root = find_report_root()
+    return os.path.join(root, config.get('cache_dir'), SERVER_SOCKET)
+
+
+def get_command(argv):
+    for arg in argv:
+        if not arg.startswith('-'):
+            return arg
+    return None
+
+
+def run_in_server(argv):
+    """
+    Run the command in `reporter serve` if it is running for this report, streaming its output
+
+    :return: The exit status of the command, or None if the command was not run by a server
+    """
+    if get_command(argv) not in SERVER_COMMANDS or "_ARGCOMPLETE" in os.environ:
+        return None
+    try:
+        socket_path = get_socket_path()
+    except ReportRootNotFound:
+        return None
+    if not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Stale socket of a server that is no longer running
+        client.close()
+        return None
+    with client:
+        client.sendall(json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n")
+        out = sys.stdout.buffer
+        status = None
+        while chunk := client.recv(65536):
+            if status is not None:
+                status += chunk
+                continue
+            output, separator, rest = chunk.partition(STATUS_SEPARATOR)
+            out.write(output)
+            out.flush()
+            if separator:
+                status = rest
+    try:
+        return json.loads(status)['status']
+    except (TypeError, ValueError, KeyError):
+        print("Connection to reporter server was lost")
+        return 1
@@ -1,11 +1,14 @@
 import argparse
 import argcomplete
 from .completers import LocationsCompleter
-from .config import REPORT_CONFIG, config, ENFORCE_VERSION, BIN_DIR
-from .util import reporter_version, find_report_root, slugify
+from .config import REPORT_CONFIG, config, ENFORCE_VERSION, BIN_DIR, USER_CACHE_DIR
+from . import profiling
+from .util import reporter_version, find_report_root, slugify, ReportRootNotFound
 from datetime import date
 import logging
+import json
 import os
+import sys
 
 def run_command(command):
     os.system(os.path.join(BIN_DIR, command))
@@ -21,7 +24,59 @@ class Commandline:
             else:
                 logging.warning(message)
 
-        self.template.reporter.generate(preprocess_only=args.preprocess_only)
+        if args.only:
+            if args.format != "pdf" or args.languages:
+                raise Exception("--only can only be used to generate pdf reports in a single language")
+            only = [name.strip() for name in args.only.split(',') if name.strip()]
+            print(self.template.reporter.preview(only, images=not args.no_images, preprocess_only=args.preprocess_only))
+        elif args.languages:
+            if args.format != "pdf":
+                raise Exception("--languages can only be used to generate pdf reports")
+            self.generate_languages(args.languages.split(','), preprocess_only=args.preprocess_only)
+        elif args.format == "pdf":
+            self.template.reporter.generate(preprocess_only=args.preprocess_only)
+        else:
+            self.template.reporter.export(args.format, args.output_file)
+
+    def generate_languages(self, languages, preprocess_only=False):
+        languages = list(dict.fromkeys(language.strip() for language in languages if language.strip()))
+        results = self.template.reporter.generate_languages(languages, preprocess_only=preprocess_only)
+        failed = []
+        for language, result in results.items():
+            if isinstance(result, Exception):
+                failed.append(language)
+                print(f"{language}: failed: {result}")
+            else:
+                print(f"{language}: {result}")
+        if failed:
+            raise Exception(f"Generating failed for: {', '.join(failed)}")
+
+    def batch_generate_caller(self, args):
+        from .batch import find_report_roots, batch_generate, format_summary
+        roots = find_report_roots(args.dirs)
+        if not roots:
+            raise Exception("No reports found in: " + ", ".join(args.dirs))
+        argv = ["generate", "--shared-cache-dir", args.shared_cache_dir or os.path.join(USER_CACHE_DIR, "shared"), "--workers", str(args.workers)]
+        if args.preprocess_only:
+            argv.append("--preprocess-only")
+        if args.no_cache:
+            argv.append("--no-cache")
+        if args.language:
+            argv += ["--language", args.language]
+        print(f"Generating {len(roots)} reports")
+        results = batch_generate(roots, argv, parallel=args.parallel)
+        print(format_summary(results))
+        failed = [result for result in results if result["status"]]
+        if failed:
+            raise Exception(f"{len(failed)} of {len(results)} reports failed")
+
+    def watch_caller(self, args):
+        self.template.reporter.watch(preprocess_only=args.preprocess_only, debounce=args.debounce)
+
+    def serve_caller(self, args):
+        from .server import Server
+        from .client import get_socket_path
+        Server(self.template, get_socket_path()).serve_forever()
 
     def init_caller(self, args):
         self.template.report_manager.init(
@@ -57,6 +112,10 @@ class Commandline:
 
     def create_evidence_caller(self, args):
         self.template.report_manager.create_evidence(args.location, args.output_file)
+        try:
+            self.template.reporter.update_location_index()
+        except ReportRootNotFound:
+            pass
 
     def finalize_caller(self, args):
         self.template.reporter.finalize()
@@ -77,8 +136,16 @@ class Commandline:
             print(issue)
 
     def diff_standard_issues_caller(self, args):
-        for issue, reason, diff in self.template.reporter.diff_standard_issues(args.show_diff):
-            if reason == "new":
+        for issue, reason, diff in self.template.reporter.diff_standard_issues(args.show_diff, color=not args.json):
+            if args.json:
+                print(json.dumps({
+                    "title": issue.title,
+                    "path": issue.path,
+                    "status": "new" if reason == "new" else "different",
+                    "differences": [] if reason == "new" else reason,
+                    "diff": diff,
+                }))
+            elif reason == "new":
                 print("Not a standard issue: " + issue.title)
             else:
                 differences = reason
@@ -86,18 +153,54 @@ class Commandline:
                 print("Issue differs from standard issue: " + issue.title + " " + different_fields)
                 if args.show_diff:
                     import textwrap
-                    print(textwrap.indent(diff.decode(), prefix='    '))
+                    print(textwrap.indent(diff, prefix='    '))
 
     def write_number_caller(self, args):
         self.template.reporter.write_issue_numbers()
 
+    def save_profile(self):
+        profiler = profiling.profiler
+        profiling.disable()
+        try:
+            output_dir = os.path.join(find_report_root(), config.get('cache_dir'))
+        except ReportRootNotFound:
+            output_dir = '.'
+        # On stderr, so the profile does not end up in output written to stdout (e.g. --format json -o -)
+        print(profiler.summary(), file=sys.stderr)
+        for path in profiler.save(output_dir):
+            print(f"Saved profile in {path}", file=sys.stderr)
+
     def add_generate_parser(self):
         generate_parser = self.subparsers.add_parser("generate", help="Generate a report")
         self.subparsers_dict['generate'] = generate_parser
-        generate_parser.add_argument("--format", "-f", help="Output format", choices=["pdf", "csv"], default="pdf")
+        generate_parser.add_argument("--format", "-f", help="Output format, formats other than pdf only export the issues", choices=["pdf", "csv", "json", "jsonl"], default="pdf")
+        generate_parser.add_argument("--output-file", "-o", help="Output file for exported issues, '-' for stdout")
         generate_parser.add_argument("--preprocess-only", "-pp", action="store_true", help="Only perform the preprocessing step")
+        generate_parser.add_argument("--languages", help="Comma separated languages (e.g. en,nl) to generate the report in, each language is built in parallel into its own output directory")
+        generate_parser.add_argument("--only", help="Generate a preview with only the given comma separated issues (directory slugs), severities and sections (.tex file names)")
+        generate_parser.add_argument("--no-images", action="store_true", help="Show outlines instead of images in a preview")
         generate_parser.set_defaults(func=self.generate_caller)
 
+    def add_batch_generate_parser(self):
+        batch_generate_parser = self.subparsers.add_parser("batch-generate", help="Generate all reports in the given directories, each in its own process")
+        self.subparsers_dict['batch_generate'] = batch_generate_parser
+        batch_generate_parser.add_argument("dirs", nargs='+', help="Report directories or directories containing reports")
+        batch_generate_parser.add_argument("--parallel", "-p", help="Number of reports that are generated at the same time", default=max(1, (os.cpu_count() or 1) // 2), type=int)
+        batch_generate_parser.add_argument("--preprocess-only", "-pp", action="store_true", help="Only perform the preprocessing step")
+        batch_generate_parser.set_defaults(func=self.batch_generate_caller)
+
+    def add_watch_parser(self):
+        watch_parser = self.subparsers.add_parser("watch", help="Generate the report whenever a file changes")
+        self.subparsers_dict['watch'] = watch_parser
+        watch_parser.add_argument("--preprocess-only", "-pp", action="store_true", help="Only perform the preprocessing step")
+        watch_parser.add_argument("--debounce", help="Seconds to wait for more changes before generating", default=0.5, type=float)
+        watch_parser.set_defaults(func=self.watch_caller)
+
+    def add_serve_parser(self):
+        serve_parser = self.subparsers.add_parser("serve", help="Keep the report loaded in a server that handles generate, locations, images and diff-standard-issues of other reporter calls")
+        self.subparsers_dict['serve'] = serve_parser
+        serve_parser.set_defaults(func=self.serve_caller)
+
     def add_init_parser(self):
         init_parser = self.subparsers.add_parser("init", help="Inititate a new report")
         self.subparsers_dict['init'] = init_parser
@@ -168,6 +271,7 @@ class Commandline:
         diff_standard_issues_parser = self.subparsers.add_parser("diff-standard-issues", help="List all issues that are not in the standard issues library.")
         self.subparsers_dict['diff_standard_issues'] = diff_standard_issues_parser
         diff_standard_issues_parser.add_argument("-d", "--show_diff", action="store_true", help="Show full git diff")
+        diff_standard_issues_parser.add_argument("--json", action="store_true", help="Output one JSON object per issue")
         diff_standard_issues_parser.set_defaults(func=self.diff_standard_issues_caller)
 
     def add_write_number_parser(self):
@@ -175,9 +279,25 @@ class Commandline:
         self.subparsers_dict['write_number'] = write_number_parser
         write_number_parser.set_defaults(func=self.write_number_caller)
 
+    # Subcommands that load the issues of the report
+    issue_subparsers = ['generate', 'batch_generate', 'watch', 'finalize', 'diff_standard_issues', 'write_number']
+    # Subcommands that render the report
+    shared_cache_subparsers = ['generate', 'batch_generate', 'watch']
+
     def add_common_args(self):
         for p in self.subparsers_dict.values():
             p.add_argument("--language", "-l", help="Language", default=config.get('language'))
+        for name in self.issue_subparsers:
+            if name in self.subparsers_dict:
+                p = self.subparsers_dict[name]
+                p.add_argument("--workers", "-j", help="Number of processes used to load issues", default=config.getint('workers'), type=int)
+                p.add_argument("--no-cache", action="store_true", help="Do not use cached issues and evidences")
+        for name in self.shared_cache_subparsers:
+            if name in self.subparsers_dict:
+                self.subparsers_dict[name].add_argument("--shared-cache-dir", help="Directory for caches that are shared between reports, such as compiled templates")
+        # Each report in a batch uses the language of its own reporter.ini unless one is given
+        if 'batch_generate' in self.subparsers_dict:
+            self.subparsers_dict['batch_generate'].set_defaults(language=None)
 
     def add_subparsers(self):
         self.add_clean_parser()
@@ -186,26 +306,41 @@ class Commandline:
         self.add_finalize_parser()
         self.add_find_root_parser()
         self.add_generate_parser()
+        self.add_batch_generate_parser()
         self.add_init_parser()
         self.add_locations_parser()
         self.add_images_parser()
         self.add_standard_issues_parser()
         self.add_diff_standard_issues_parser()
         self.add_write_number_parser()
+        self.add_watch_parser()
+        self.add_serve_parser()
 
-    def parse_args(self):
-        args = self.parser.parse_args()
-        if hasattr(args, 'language') and args.language != self.template.language:
+    def parse_args(self, argv=None):
+        args = self.parser.parse_args(argv)
+        if getattr(args, 'language', None) and args.language != self.template.language:
             self.template.language = args.language
+        if hasattr(args, 'workers'):
+            self.template.reporter_args['workers'] = args.workers
+        if hasattr(args, 'no_cache'):
+            self.template.reporter_args['use_cache'] = not args.no_cache
+        if getattr(args, 'shared_cache_dir', None):
+            self.template.reporter_args['shared_cache_dir'] = args.shared_cache_dir
         if hasattr(args, 'func'):
+            if args.profile or args.cprofile:
+                profiling.enable(use_cprofile=args.cprofile)
             try:
-                args.func(args)
+                with profiling.phase("reporter " + args.func.__name__.replace("_caller", "")):
+                    args.func(args)
             except Exception as e:
                 if args.debug:
                     raise e
                 else:
                     print(e)
                     return
+            finally:
+                if profiling.profiler:
+                    self.save_profile()
         else:
             self.parser.print_usage()
 
@@ -213,6 +348,8 @@ class Commandline:
         self.template = template
         self.parser = argparse.ArgumentParser()
         self.parser.add_argument("--debug", action="store_true", help="Debug mode")
+        self.parser.add_argument("--profile", action="store_true", help="Show and save the time spent in each phase")
+        self.parser.add_argument("--cprofile", action="store_true", help="Like --profile, also save cProfile statistics")
         self.subparsers = self.parser.add_subparsers(help='Subcommands')
         self.add_subparsers()
         self.add_common_args()        
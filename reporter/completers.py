@@ -1,8 +1,25 @@
-from .config import config
+import os
+from .config import config, LOCATION_INDEX, TEMPLATES_DIR, PARENTS_FILE, COMMANDLINE_LIB
+from .util import find_report_root
+from .locations import LocationIndex
 
-def LocationsCompleter(template, **kwargs):
-    from .reporter import Template
-    template = Template(config.get('template'), language=config.get('lanaguage'))
-    locations = template.reporter.get_locations()
-    return list(locations)
+def LocationsCompleter(**kwargs):
+    root = find_report_root()
+    index = LocationIndex(os.path.join(root, config.get('cache_dir'), LOCATION_INDEX))
+    return sorted(index.update(os.path.join(root, config.get('issue_dir')), strict=False))
 
+
+def has_commandline_override(name):
+    """Check whether the template or one of its parents has its own command line, without loading the template"""
+    names = [name]
+    parents = os.path.join(TEMPLATES_DIR, name, PARENTS_FILE)
+    if os.path.exists(parents):
+        with open(parents) as f:
+            names += f.read().split()
+    return any(os.path.exists(os.path.join(TEMPLATES_DIR, n, COMMANDLINE_LIB)) for n in names)
+
+
+def complete():
+    """Complete the command line of the shell and exit, only the parser is built"""
+    from .commandline import Commandline
+    Commandline(None)
@@ -1,5 +1,7 @@
-from os.path import realpath, dirname, join
+from os.path import realpath, dirname, join, expanduser
 import configparser
+import hashlib
+import os
 from .util import find_report_root, ReportRootNotFound, reporter_version
 
 severities = [
@@ -39,9 +41,42 @@ STANDARD_ISSUE_DIR = join(dir, "../standard-issue-library")
 # Directory with bash scripts that can be executed
 BIN_DIR = join(dir, "../bin")
 
+# Directory for caches that are not specific to a report
+USER_CACHE_DIR = join(os.environ.get("XDG_CACHE_HOME") or expanduser("~/.cache"), "reporter")
+
+# Index of the standard issue library, unique per library location
+STANDARD_ISSUE_INDEX = join(USER_CACHE_DIR, "standard_issues_{}.pickle".format(
+    hashlib.sha256(realpath(STANDARD_ISSUE_DIR).encode()).hexdigest()[:16]))
+
 # Report config file name
 REPORT_CONFIG = "reporter.ini"
 
+# Content hashes of generated files, relative to the cache dir
+BUILD_MANIFEST = "manifest.json"
+# Files synced to the output directory, relative to the cache dir
+SYNC_MANIFEST = "synced.json"
+# Marks that the report was compiled from the current output, relative to the output dir
+BUILD_STAMP = "build.stamp"
+
+# Compiled jinja templates, relative to the cache dir
+BYTECODE_CACHE_DIR = "jinja"
+
+# Parsed issues and evidences, relative to the cache dir
+ISSUE_CACHE = "issues.pickle"
+
+# Evidence locations per issue directory, relative to the cache dir
+LOCATION_INDEX = "locations.json"
+# Snapshot of the merged static content per language, relative to the cache dir
+STATIC_CONTENT_CACHE = "static_content_{language}.pickle"
+# Snapshot of the static content of a template by a hash of its source files, relative to the shared cache dir
+STATIC_CONTENT_SNAPSHOT = "static_content_{key}.pickle"
+
+# Optimized images, relative to the cache dir
+IMAGE_CACHE_DIR = "images"
+
+# Unix socket of `reporter serve`, relative to the cache dir
+SERVER_SOCKET = "reporter.sock"
+
 #########
 # Directories within template
 #########
@@ -54,6 +89,15 @@ STATIC_CONTENT_DIR = "static_content"
 
 STATIC_IMAGES_DIR = "static_images"
 
+# Directory with templates that are rendered for each issue, these are not rendered directly
+FRAGMENTS_DIR = "fragments"
+
+# Template for the fragment of each issue, relative to the report template dir
+ISSUE_FRAGMENT = "fragments/issue.tex"
+
+# Directory in the output dir with the rendered fragment of each issue
+FINDINGS_OUTPUT_DIR = "findings"
+
 DYNAMIC_TEXT_LIB = "dynamic_text.py"
 
 CONFIG_LIB = "config.py"
@@ -91,6 +135,15 @@ DEFAULTS = {
     "reporter_version": reporter_version,
     "show_locations": True,
     "default_location": "evidence",
+    # Number of processes used to load issues
+    "workers": 1,
+    # Also compare a hash of the contents when checking whether cached issues are up to date
+    "cache_hash": False,
+    # Downscale and recompress the images in images/ before compiling (requires Pillow)
+    "optimize_images": False,
+    # Resolution and maximum width in cm of optimized images
+    "image_dpi": 150,
+    "image_width": 16,
 }
 
 parser = configparser.ConfigParser()
@@ -1,7 +1,22 @@
-from cvss import CVSS3
+from collections import namedtuple
+from functools import lru_cache
+
+Scores = namedtuple("Scores", ["base", "temporal", "environmental", "severity"])
+
+
+@lru_cache(maxsize=4096)
+def vector_to_scores(vector):
+    # cvss is imported when a vector is scored, so shell completion (which loads evidences) does not import it
+    from cvss import CVSS3
+    base, temporal, environmental = CVSS3(vector).scores()
+    return Scores(base, temporal, environmental, score_to_severity(environmental))
 
 def vector_to_score(vector):
-    return CVSS3(vector).scores()[2]
+    return vector_to_scores(vector).environmental
+
+def score_vectors(vectors):
+    """Score many vectors at once, each unique vector is scored once, returns a dict of vector to Scores"""
+    return {vector: vector_to_scores(vector) for vector in set(vectors)}
 
 def score_to_severity(score):
     if not isinstance(score, float):
@@ -0,0 +1,70 @@
+import csv
+import json
+
+CSV_FIELDS = ["number", "severity", "cvss_score", "cvss_vector", "title", "location", "description", "solution", "references", "path"]
+
+
+def issue_locations(issue):
+    """Locations of an issue, in the same way as they are shown in the report"""
+    if 'location' in issue.content:
+        return [issue.location]
+    locations = []
+    for evidence in issue.evidences:
+        if evidence['location'] not in locations:
+            locations.append(evidence['location'])
+    return locations
+
+
+def issue_record(issue):
+    """Dict with the fields of an issue as shown in the report"""
+    record = dict(issue.items())
+    record.update({
+        "number": issue.number,
+        "severity": issue.severity,
+        "cvss_score": str(issue.cvss_score),
+        "location": ", ".join(issue_locations(issue)),
+        "path": issue.path,
+    })
+    return record
+
+
+def iter_issues(issue_dict):
+    """Issues of an issue dict (see create_issue_dict) in the order of the report"""
+    for issues in issue_dict.values():
+        yield from issues
+
+
+def export_csv(issue_dict, f):
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for issue in iter_issues(issue_dict):
+        writer.writerow(issue_record(issue))
+
+
+def json_record(issue):
+    record = issue_record(issue)
+    record['cvss_score'] = float(issue.cvss_score)
+    record['locations'] = issue_locations(issue)
+    record['evidences'] = [{k: v for k, v in evidence.items()} for evidence in issue.evidences]
+    return record
+
+
+def export_jsonl(issue_dict, f):
+    for issue in iter_issues(issue_dict):
+        f.write(json.dumps(json_record(issue), default=str))
+        f.write("\n")
+
+
+def export_json(issue_dict, f):
+    f.write("[")
+    for i, issue in enumerate(iter_issues(issue_dict)):
+        f.write(",\n" if i else "\n")
+        f.write(json.dumps(json_record(issue), default=str))
+    f.write("\n]\n")
+
+
+exporters = {
+    "csv": export_csv,
+    "json": export_json,
+    "jsonl": export_jsonl,
+}
@@ -0,0 +1,134 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .util import hash_file
+
+# Images that are downscaled and recompressed, other files are used as-is
+OPTIMIZED_EXTENSIONS = [".png", ".jpg", ".jpeg"]
+
+
+def max_pixel_width(width_cm, dpi):
+    return round(width_cm / 2.54 * dpi)
+
+
+def optimize_image(src, dst, max_width, dpi):
+    """Downscale src to at most max_width pixels and store it recompressed in dst"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise Exception("Optimizing images requires Pillow, install it with `pip install pillow` or disable optimize_images")
+    with Image.open(src) as image:
+        if image.width > max_width:
+            height = max(1, round(image.height * max_width / image.width))
+            image = image.resize((max_width, height), Image.LANCZOS)
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        if os.path.splitext(dst)[1].lower() == ".png":
+            image.save(tmp, format="PNG", optimize=True, dpi=(dpi, dpi))
+        else:
+            image.convert("RGB").save(tmp, format="JPEG", quality=85, optimize=True, dpi=(dpi, dpi))
+    os.replace(tmp, dst)
+    return dst
+
+
+class ImageOptimizer:
+    """
+    Optimized copies of the images of a report, stored by the hash of the source image and the settings
+
+    Each image is only processed once, the hashes of source images are kept in an index with their size and mtime.
+    Optimized copies that are no longer used by the images are removed after each run.
+    """
+
+    def __init__(self, cache_dir, width_cm=16, dpi=150, workers=1):
+        self.cache_dir = cache_dir
+        self.max_width = max_pixel_width(width_cm, dpi)
+        self.dpi = dpi
+        self.workers = workers
+        self.index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+
+    def source_hash(self, path):
+        stat = os.stat(path)
+        record = self.index.get(path)
+        if record and record[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return record[2]
+        digest = hash_file(path)
+        self.index[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def cached_path(self, path):
+        _, ext = os.path.splitext(path)
+        if ext.lower() not in OPTIMIZED_EXTENSIONS:
+            return None
+        return os.path.join(self.cache_dir, f"{self.source_hash(path)}-{self.max_width}-{self.dpi}{ext.lower()}")
+
+    def optimize(self, images_dir, output_dir):
+        """
+        Fill output_dir with symlinks to optimized copies of the files in images_dir, files that cannot be optimized are linked directly
+
+        :return: List of output paths that were created, changed or removed
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        targets = {}
+        pending = {}
+        for dirpath, dnames, fnames in os.walk(images_dir):
+            dnames[:] = [d for d in dnames if not d.startswith('.')]
+            for fname in fnames:
+                src = os.path.join(dirpath, fname)
+                relpath = os.path.relpath(src, images_dir)
+                cached = self.cached_path(src)
+                if not cached:
+                    targets[relpath] = os.path.realpath(src)
+                    continue
+                targets[relpath] = cached
+                if not os.path.exists(cached):
+                    pending[cached] = src
+
+        if self.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(optimize_image, pending.values(), pending.keys(), [self.max_width] * len(pending), [self.dpi] * len(pending)))
+        else:
+            for dst, src in pending.items():
+                optimize_image(src, dst, self.max_width, self.dpi)
+
+        with open(self.index_path, 'w') as f:
+            json.dump({path: record for path, record in self.index.items() if os.path.exists(path)}, f)
+        self.prune(targets.values())
+        return self.link(targets, output_dir)
+
+    def prune(self, used):
+        """Remove the optimized copies that are not in used"""
+        keep = set(used) | {self.index_path}
+        for fname in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, fname)
+            if path not in keep and os.path.isfile(path):
+                os.remove(path)
+
+    @staticmethod
+    def link(targets, output_dir):
+        """Make output_dir contain exactly the given symlinks (relative path to target)"""
+        if os.path.islink(output_dir):
+            os.remove(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        changed = []
+        for relpath, target in targets.items():
+            dst = os.path.join(output_dir, relpath)
+            if os.path.islink(dst) and os.readlink(dst) == target:
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.symlink(target, dst)
+            changed.append(dst)
+        for dirpath, dnames, fnames in os.walk(output_dir, topdown=False):
+            for fname in fnames:
+                dst = os.path.join(dirpath, fname)
+                if os.path.relpath(dst, output_dir) not in targets:
+                    os.remove(dst)
+                    changed.append(dst)
+            if dirpath != output_dir and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        return changed
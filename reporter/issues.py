@@ -1,13 +1,24 @@
 from textile_parser import parse_textile_file, check_issue, generate_textile
-from .cvss_util import score_to_severity, vector_to_score
+from .cvss_util import vector_to_scores
 from .config import config
+from concurrent.futures import ProcessPoolExecutor
 import yaml
 import os
+import copy
+import pickle
 import shutil
+import hashlib
+
+try:
+    # libyaml is much faster, but is not always available
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 def load_content(filename):
     with open(filename) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=SafeLoader)
 
 
 def read_file(filename):
@@ -31,9 +42,14 @@ def load_issue_evidence(filename):
             return parse_textile_file(filename)
 
 
-def load_evidence(filename):
-    """Load evidence from a given evidence file"""
-    content = load_issue_evidence(filename)
+def load_evidence(filename, content=None):
+    """
+    Load evidence from a given evidence file
+
+    :param content: Parsed content of the file, if it was already parsed
+    """
+    if content is None:
+        content = load_issue_evidence(filename)
     if not content.get('location'):
         content['location'] = config.get('default_location')
         if not content['location']:
@@ -49,35 +65,63 @@ class Issue:
         if 'number' in content:
             content['number'] = int(content['number'])
         self.content = content
+        self.scores = None
         self.path = path
-        self.raw_content = raw_content
+        # Not part of the content, so it is not exported or passed to the templates
+        self._raw_content = raw_content
 
     def __getattr__(self, name):
+        if name == "content":
+            # Not set yet, e.g. while unpickling
+            raise AttributeError(name)
         try:
             return self.content[name]
         except KeyError:
             raise AttributeError(name)
 
     def __setattr__(self, name, value):
-        if name == "content":
+        if name in ["content", "scores", "_raw_content"]:
             super().__setattr__(name, value)
         else:
             self.content[name] = value
+            if name == "cvss_vector":
+                super().__setattr__("scores", None)
 
     def items(self):
         for k, v in self.content.items():
             if k not in ['evidences', 'path']:
                 yield k,v
 
+    @property
+    def raw_content(self):
+        """Unprocessed fields of the issue file, only parsed when needed (e.g. for write_back)"""
+        if self._raw_content is None and self.path:
+            self._raw_content = parse_textile_file(self.path, raw=True)
+        return self._raw_content
+
     # def __hasattr__(self, name):
     #     return 'name' in self.content
+    def score(self):
+        """Calculate the CVSS scores of the issue"""
+        try:
+            self.scores = vector_to_scores(self.cvss_vector)
+        except Exception as e:
+            raise Exception(f"Issue: {self.path} has an invalid CVSS vector: {e}") from e
+        return self.scores
+
+    @property
+    def cvss_scores(self):
+        if self.scores is None:
+            self.score()
+        return self.scores
+
     @property
     def cvss_score(self):
-        return vector_to_score(self.cvss_vector)
+        return self.cvss_scores.environmental
 
     @property
     def severity(self):
-        return score_to_severity(self.cvss_score)
+        return self.cvss_scores.severity
 
     def write_back(self, extra_fields=[]):
         content = self.raw_content.copy()
@@ -91,26 +135,115 @@ class Issue:
         return str(self.content)
 
 
-def load_issue(issue):
+class ParseCache:
+    """
+    On-disk cache of parsed issue and evidence files
+
+    Entries are keyed on the path and are only valid while the mtime and size (and optionally a hash of the contents) of the file are unchanged.
+    """
+
+    def __init__(self, path, use_hash=False):
+        self.path = path
+        self.use_hash = use_hash
+        try:
+            with open(path, 'rb') as f:
+                self.entries = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.entries = {}
+
+    def key(self, filename):
+        stat = os.stat(filename)
+        digest = None
+        if self.use_hash:
+            with open(filename, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def get(self, filename):
+        """Return the cached content of filename, or None if the file changed"""
+        entry = self.entries.get(filename)
+        if entry is None or entry[0] != self.key(filename):
+            return None
+        return copy.deepcopy(entry[1])
+
+    def set(self, filename, content):
+        self.entries[filename] = (self.key(filename), copy.deepcopy(content))
+
+    def prune(self, filenames):
+        """Evict all entries that are not in filenames"""
+        filenames = set(filenames)
+        for filename in list(self.entries):
+            if filename not in filenames:
+                del self.entries[filename]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'wb') as f:
+            pickle.dump(self.entries, f)
+
+
+def parse_files(filenames):
+    """Parse issue and evidence files, returns a dict of filename to content"""
+    parsed = {}
+    for filename in filenames:
+        try:
+            parsed[filename] = load_issue_evidence(filename)
+        except Exception as e:
+            print(f"Exception while parsing: {filename}")
+            raise e
+    return parsed
+
+
+def load_issue(issue, content=None):
+    """
+    Load an issue from a given issue file
+
+    :param content: Parsed content of the file, if it was already parsed
+    """
     _, extension = os.path.splitext(issue)
     if extension == "tex":
         # The file is already a complete issue
         return read_file(issue)
-    content = load_issue_evidence(issue)
-    raw_content = parse_textile_file(issue, raw=True)
+    if content is None:
+        content = load_issue_evidence(issue)
     check_issue(content)
-    return Issue(content, raw_content=raw_content, path=issue)
+    return Issue(content, path=issue)
+
+
+def load_evidences(evidences, parsed={}):
+    for evidence in evidences:
+        try:
+            yield load_evidence(evidence, parsed.get(evidence))
+        except Exception as e:
+            print(f"Exception while loading evidence: {evidence}")
+            raise e
 
 
-def load_issue_with_evidences(issue, evidences):
+def load_issue_with_evidences(issue, evidences, parsed={}):
+    """
+    :param parsed: Dict of filename to content of files that were already parsed
+    """
     try:    
-        issue = load_issue(issue)
+        loaded = load_issue(issue, parsed.get(issue))
+        loaded.score()
     except Exception as e:
         print(f"Exception while loading issue: {issue}")
         raise e
-    evidences = map(load_evidence, evidences)
-    issue.content['evidences'] = list(evidences)
-    return issue
+    loaded.content['evidences'] = list(load_evidences(evidences, parsed))
+    return loaded
+
+
+def split_issue_and_evidences(dirpath, fnames):
+    """Return the path of the issue file (or None) and a list of evidence paths in an issue directory"""
+    issue = None
+    evidences = []
+    for filename in sorted(fnames):
+        path = os.path.join(dirpath, filename)
+        if filename.startswith("issue") or filename.endswith(".issue"):
+            issue = path
+        else:
+            evidences.append(path)
+    return issue, evidences
 
 
 def find_issues_and_evidences(issue_dir=config.get('issue_dir')):
@@ -119,22 +252,46 @@ def find_issues_and_evidences(issue_dir=config.get('issue_dir')):
         relpath = os.path.relpath(dirpath, issue_dir)
         if relpath == '.':
             continue
-        # Get Issue file
-        issue = None
-        evidences = []
-        for filename in sorted(fnames):
-            path = os.path.join(dirpath, filename)
-            if filename.startswith("issue") or filename.endswith(".issue"):
-                issue = path
-            else:
-                evidences.append(path)
+        issue, evidences = split_issue_and_evidences(dirpath, fnames)
         if issue:
             yield issue, evidences
 
 
-def load_issues_with_evidences(issue_dir=config.get('issue_dir')):
-    for issue, evidences in find_issues_and_evidences(issue_dir):
-        yield load_issue_with_evidences(issue, evidences)
+def load_issues_with_evidences(issue_dir=config.get('issue_dir'), workers=1, cache=None):
+    """
+    Load all issues with their evidences, in the order of find_issues_and_evidences
+
+    :param workers: Number of processes to parse issue directories in, the files are parsed in the current process if this is 1
+    :param cache: ParseCache, only files that are not in the cache are parsed
+    """
+    found = list(find_issues_and_evidences(issue_dir))
+    parsed = {}
+    if cache:
+        cache.prune(f for issue, evidences in found for f in [issue] + evidences)
+        for issue, evidences in found:
+            for f in [issue] + evidences:
+                content = cache.get(f)
+                if content is not None:
+                    parsed[f] = content
+    # Files to parse, grouped per issue directory
+    groups = [[f for f in [issue] + evidences if f not in parsed] for issue, evidences in found]
+    groups = [group for group in groups if group]
+    if workers <= 1 or len(groups) <= 1:
+        new = [parse_files(group) for group in groups]
+    else:
+        chunksize = max(1, len(groups) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map re-raises the original exception of a failed file
+            new = list(executor.map(parse_files, groups, chunksize=chunksize))
+    for group in new:
+        parsed.update(group)
+        if cache:
+            for filename, content in group.items():
+                cache.set(filename, content)
+    if cache:
+        cache.save()
+    for issue, evidences in found:
+        yield load_issue_with_evidences(issue, evidences, parsed)
 
 
 def load_issues(**kwargs):
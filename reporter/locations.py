@@ -0,0 +1,76 @@
+import json
+import os
+
+
+class LocationIndex:
+    """
+    Index of the evidence locations per issue directory, stored as JSON
+
+    Only issue directories of which the directory or one of the files changed are scanned again.
+    This module does not import the parsing libraries unless a directory has to be scanned, to keep shell completion fast.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.dirs = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.dirs = {}
+
+    @staticmethod
+    def signature(dirpath, fnames):
+        stats = []
+        for fname in sorted(fnames):
+            stat = os.stat(os.path.join(dirpath, fname))
+            stats.append([fname, stat.st_mtime_ns, stat.st_size])
+        return [os.stat(dirpath).st_mtime_ns, stats]
+
+    def scan(self, dirpath, fnames, evidences, strict):
+        from .issues import split_issue_and_evidences, load_evidence
+        issue, paths = split_issue_and_evidences(dirpath, fnames)
+        if not issue:
+            return []
+        locations = []
+        for path in paths:
+            if path in evidences:
+                locations.append(evidences[path])
+                continue
+            try:
+                locations.append(load_evidence(path)['location'])
+            except Exception:
+                if strict:
+                    raise
+                # Scan the directory again next time
+                return None
+        return locations
+
+    def update(self, issue_dir, evidences={}, strict=True):
+        """
+        Scan changed issue directories, save the index and return all locations
+
+        :param evidences: Dict of evidence path to location, for evidences that are already loaded
+        :param strict: Raise exceptions of evidences that cannot be loaded, otherwise they are skipped
+        """
+        dirs = {}
+        locations = set()
+        for dirpath, _, fnames in os.walk(issue_dir):
+            if os.path.relpath(dirpath, issue_dir) == '.':
+                continue
+            signature = self.signature(dirpath, fnames)
+            entry = self.dirs.get(dirpath)
+            if not entry or entry['signature'] != signature:
+                dir_locations = self.scan(dirpath, fnames, evidences, strict)
+                if dir_locations is None:
+                    continue
+                entry = {'signature': signature, 'locations': dir_locations}
+            dirs[dirpath] = entry
+            locations.update(entry['locations'])
+        self.dirs = dirs
+        self.save()
+        return locations
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.dirs, f)
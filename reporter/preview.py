@@ -0,0 +1,97 @@
+import os
+import re
+from collections import OrderedDict
+from .config import severities
+
+INPUT = re.compile(r"\\input\s*\{([^}]*)\}")
+BEGIN_DOCUMENT = re.compile(r"\\begin\s*\{document\}")
+PREVIEW_BEGIN = "% Begin of preview settings, added by reporter generate --only\n"
+PREVIEW_END = "% End of preview settings\n"
+
+
+def select_issues(issue_dict, only):
+    """
+    Keep the issues of which the slug or severity is in only, the issues keep their numbers
+
+    :return: Tuple (filtered issue dict, selectors that did not match an issue or severity,
+        whether any selector matched an issue or severity)
+    """
+    selected = OrderedDict((severity, [issue for issue in issues if issue.slug in only or severity in only])
+                           for severity, issues in issue_dict.items())
+    slugs = {issue.slug for issues in issue_dict.values() for issue in issues}
+    sections = [name for name in only if name not in slugs and name not in severities]
+    return selected, sections, len(sections) < len(only)
+
+
+def check_sections(sections, known):
+    unknown = [name for name in sections if name not in known]
+    if unknown:
+        raise Exception(f"Unknown issue, severity or section: {', '.join(unknown)}")
+
+
+def section_name(path):
+    name = os.path.normpath(path)
+    return name[:-len(".tex")] if name.endswith(".tex") else name
+
+
+def find_inputs(path):
+    with open(path, errors='replace') as f:
+        return [section_name(name) for name in INPUT.findall(f.read())]
+
+
+def sections_to_skip(output_dir, main_file, sections, inputs_to_keep=None):
+    """
+    Names of the sections (.tex files in output_dir that are not the main file) that are not needed for the given sections
+
+    Sections that \\input one of the given sections or one of inputs_to_keep (directly or indirectly) are kept.
+    """
+    names = [section_name(f) for f in os.listdir(output_dir) if f.endswith(".tex") and f != main_file]
+    check_sections(sections, names)
+    inputs = {name: find_inputs(os.path.join(output_dir, name + ".tex")) for name in names}
+    keep = set(sections) | {section_name(path) for path in inputs_to_keep or []}
+    added = True
+    while added:
+        added = False
+        for name, children in inputs.items():
+            if name not in keep and keep.intersection(children):
+                keep.add(name)
+                added = True
+    return sorted(set(names) - keep)
+
+
+def preview_settings(skipped, draft_images):
+    lines = [PREVIEW_BEGIN, "\\makeatletter\n"]
+    lines.append("\\let\\reporter@iinput\\@iinput\n")
+    lines.append("\\def\\@iinput#1{\\ifcsname reporter@skip@\\detokenize{#1}\\endcsname\\else\\reporter@iinput{#1}\\fi}\n")
+    for name in skipped:
+        for variant in [name, name + ".tex"]:
+            lines.append(f"\\expandafter\\def\\csname reporter@skip@{variant}\\endcsname{{}}\n")
+    if draft_images:
+        # Show the outline of images instead of the images
+        lines.append("\\setkeys{Gin}{draft}\n")
+    lines += ["\\makeatother\n", PREVIEW_END]
+    return "".join(lines)
+
+
+def apply_preview_settings(main_path, settings):
+    """
+    Add the preview settings just before \\begin{document} of the main file, replacing earlier preview settings
+
+    :return: Whether the file changed
+    """
+    with open(main_path) as f:
+        text = f.read()
+    original = text
+    if PREVIEW_BEGIN in text:
+        start = text.index(PREVIEW_BEGIN)
+        end = text.index(PREVIEW_END, start) + len(PREVIEW_END)
+        text = text[:start] + text[end:]
+    match = BEGIN_DOCUMENT.search(text)
+    if not match:
+        raise Exception(f"No \\begin{{document}} in {main_path}")
+    text = text[:match.start()] + settings + text[match.start():]
+    if text == original:
+        return False
+    with open(main_path, 'w') as f:
+        f.write(text)
+    return True
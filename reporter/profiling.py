@@ -0,0 +1,82 @@
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def cpu_time():
+    """CPU time of this process and its finished child processes (such as make)"""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class Profiler:
+    """Records the wall and CPU time of (nested) phases"""
+
+    def __init__(self, use_cprofile=False):
+        self.records = []
+        self.stack = []
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        if self.cprofile:
+            self.cprofile.enable()
+
+    @contextmanager
+    def phase(self, name):
+        self.stack.append(name)
+        record = {"name": " > ".join(self.stack), "depth": len(self.stack) - 1}
+        # Add the record before running, so phases are listed in the order they started
+        self.records.append(record)
+        wall, cpu = time.perf_counter(), cpu_time()
+        try:
+            yield
+        finally:
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = cpu_time() - cpu
+            self.stack.pop()
+
+    def stop(self):
+        if self.cprofile:
+            self.cprofile.disable()
+
+    def summary(self):
+        lines = [f"{'Phase':<60} {'Wall (s)':>10} {'CPU (s)':>10}"]
+        for record in self.records:
+            name = "  " * record["depth"] + record["name"].split(" > ")[-1]
+            lines.append(f"{name[:60]:<60} {record.get('wall', 0):>10.3f} {record.get('cpu', 0):>10.3f}")
+        return "\n".join(lines)
+
+    def save(self, output_dir):
+        """Save the trace as JSON and, if enabled, the cProfile stats, returns the paths of the written files"""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = [os.path.join(output_dir, "profile.json")]
+        with open(paths[0], 'w') as f:
+            json.dump({"phases": self.records}, f, indent=1)
+        if self.cprofile:
+            paths.append(os.path.join(output_dir, "profile.prof"))
+            self.cprofile.dump_stats(paths[1])
+        return paths
+
+
+# Profiler of the current command, None if profiling is disabled
+profiler = None
+
+
+def enable(use_cprofile=False):
+    global profiler
+    profiler = Profiler(use_cprofile)
+    return profiler
+
+
+def disable():
+    global profiler
+    if profiler:
+        profiler.stop()
+    profiler = None
+
+
+def phase(name):
+    """Context manager that records the time of a phase, if profiling is enabled"""
+    if profiler:
+        return profiler.phase(name)
+    return nullcontext()
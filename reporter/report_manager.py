@@ -1,15 +1,17 @@
-from .config import ISSUE_TEMPLATES_DIR, STANDARD_ISSUE_DIR, config, REPORT_INIT_DIR
-from .util import find_report_root, reporter_version, slugify, template
-from .issues import load_issue
+from .config import ISSUE_TEMPLATES_DIR, STANDARD_ISSUE_DIR, STANDARD_ISSUE_INDEX, config, REPORT_INIT_DIR
+from .util import find_report_root, reporter_version, slugify, template, get_env
+from .standard_issues import StandardIssueIndex
 
 import shutil
 import os
 from deepmerge import always_merger
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 from functools import reduce
 
 class ReportManager:
+    # Index of the standard issue library, shared by all instances in a process
+    _standard_issue_index = None
+
     report_defaults = {
         "title": "Title of the project", 
         "company": "Company B.V.", 
@@ -62,8 +64,7 @@ class ReportManager:
             **issue_fields):
         """Create a new issue"""
         content = always_merger.merge(self.issue_defaults, issue_fields)
-        env = Environment(loader=FileSystemLoader(ISSUE_TEMPLATES_DIR))
-        template = env.get_template("issue.dradis")
+        template = get_env(ISSUE_TEMPLATES_DIR).get_template("issue.dradis")
         rendered = template.render(content)
         dirname = os.path.dirname(output_file)
         os.makedirs(dirname, exist_ok=True)
@@ -103,8 +104,7 @@ class ReportManager:
         """Create a new evidence"""
         if not output_file:
             output_file = os.path.join(output_dir, self.create_evidence_path(location, output_dir))
-        env = Environment(loader=FileSystemLoader(ISSUE_TEMPLATES_DIR))
-        template = env.get_template("evidence.dradis")
+        template = get_env(ISSUE_TEMPLATES_DIR).get_template("evidence.dradis")
         rendered = template.render(location=location, description=description)
         with open(output_file, 'w') as f:
             f.write(rendered)
@@ -112,20 +112,23 @@ class ReportManager:
 
 
     def clean(self):
-        """Clean current report of build files"""
+        """Clean current report of build files and caches"""
         root = find_report_root()
         shutil.rmtree(os.path.join(root, config.get('cache_dir')))
 
 
+    @property
+    def standard_issue_index(self):
+        if not ReportManager._standard_issue_index:
+            ReportManager._standard_issue_index = StandardIssueIndex(STANDARD_ISSUE_INDEX)
+        return ReportManager._standard_issue_index.update()
+
     def get_standard_issues(self, contents=False):
-        for folder, subfolders, files in os.walk(STANDARD_ISSUE_DIR):
-            for file in files:
-                _, extension = os.path.splitext(file)
-                absPath = os.path.join(folder, file)
-                filePath = os.path.relpath(absPath, STANDARD_ISSUE_DIR)
-                if extension == ".issue":
-                    if contents:
-                        yield load_issue(absPath)
-                    else:
-                        yield filePath
+        index = self.standard_issue_index
+        if contents:
+            yield from index.issues()
+        else:
+            yield from index.paths()
 
+    def get_standard_issues_by_title(self):
+        return self.standard_issue_index.by_title()
@@ -3,19 +3,33 @@ from os.path import join
 import subprocess
 from collections import defaultdict, OrderedDict
 
-from .util import find_report_root, template
+from .util import find_report_root, template, unified_diff, get_latex_env, write_output_stream, cascade_map, BuildManifest, SyncManifest, hash_text
 from .config import (COMMANDLINE_LIB, REPORT_MANAGER_LIB, severities, TEMPLATES_DIR, STATIC_CONTENT_DIR, STATIC_IMAGES_DIR,
                      NECESSARY_FILES_DIR, REPORT_TEMPLATE_DIR, PARENTS_FILE,
-                     DYNAMIC_TEXT_LIB, BASE_TEMPLATE, CONFIG_LIB, REPORTER_LIB, config)
+                     DYNAMIC_TEXT_LIB, BASE_TEMPLATE, CONFIG_LIB, REPORTER_LIB, BUILD_MANIFEST, SYNC_MANIFEST, BUILD_STAMP,
+                     BYTECODE_CACHE_DIR, ISSUE_CACHE, LOCATION_INDEX, STATIC_CONTENT_CACHE, STATIC_CONTENT_SNAPSHOT, IMAGE_CACHE_DIR, FRAGMENTS_DIR, ISSUE_FRAGMENT,
+                     FINDINGS_OUTPUT_DIR, config)
 import importlib
 import subprocess
 import os
+import copy
+import io
+import re
+import sys
 import shutil
 from functools import reduce
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from deepmerge import always_merger
 from .commandline import Commandline
 from .report_manager import ReportManager
-from .issues import load_content, load_issues_with_evidences, find_issues_and_evidences, load_evidence, copy_output
+from .watch import watch
+from .locations import LocationIndex
+from .static_content import StaticContentSnapshot
+from .images import ImageOptimizer
+from .preview import select_issues, section_name, check_sections, sections_to_skip, preview_settings, apply_preview_settings
+from .export import exporters
+from .profiling import phase
+from .issues import load_content, load_issues_with_evidences, copy_output, ParseCache
 
 
 def merge_dicts(dict_list):
@@ -44,6 +58,23 @@ def create_issue_dict(issues):
     return ordered
 
 
+def compare_issues(issue, standard_issue, show_diff=False, color=True):
+    """Return the fields in which issue differs from standard_issue, and the diff of their files if show_diff is set"""
+    differences = []
+    for k, v in issue.items():
+        if k == 'label':
+            continue
+        try:
+            if v != getattr(standard_issue, k):
+                differences.append(k)
+        except AttributeError:
+            continue
+    diff = None
+    if show_diff:
+        diff = unified_diff(standard_issue.path, issue.path, color=color)
+    return differences, diff
+
+
 class Template:
     def __init__(self, name=BASE_TEMPLATE, language=config.get('language'), **kwargs):
         self.name = name
@@ -69,19 +100,58 @@ class Template:
         else:
             return [self]
 
+    # Python files of templates loaded in this process, by path
+    _modules = {}
+    # Resolved override classes, by (template name, library, class name)
+    _classes = {}
+
+    def load_module(self, path):
+        """
+        Load a python file of this template, each file is only loaded once per process
+
+        The module is registered in sys.modules under a name that is unique for the template and file.
+        """
+        path = os.path.normpath(path)
+        if path not in Template._modules:
+            if not Path(path).exists():
+                Template._modules[path] = None
+            else:
+                filename, _ = os.path.splitext(os.path.basename(path))
+                name = re.sub(r'\W', '_', f"template_{self.name}_{filename}")
+                spec = importlib.util.spec_from_file_location(name, path)
+                mod = importlib.util.module_from_spec(spec)
+                sys.modules[name] = mod
+                try:
+                    spec.loader.exec_module(mod)
+                except BaseException:
+                    del sys.modules[name]
+                    raise
+                Template._modules[path] = mod
+        mod = Template._modules[path]
+        if mod is None:
+            raise FileNotFoundError(path)
+        return mod
+
+    def override_class(self, lib, class_name, default):
+        """Get class_name from the first template in the inheritance tree that has the given library, or default"""
+        key = (self.name, lib, class_name)
+        if key not in Template._classes:
+            cls = default
+            for t in self.inheritance_tree:
+                path = getattr(t, lib)
+                if Path(path).exists():
+                    cls = getattr(t.load_module(path), class_name)
+                    break
+            Template._classes[key] = cls
+        return Template._classes[key]
+
     @property
     def reporter(self):
         return self.reporter_class(self, **self.reporter_args)
 
     @property
     def reporter_class(self):
-        for t in self.inheritance_tree:
-            if Path(t.REPORTER_LIB).exists():
-                spec = importlib.util.spec_from_file_location("template_reporter", t.REPORTER_LIB)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                return mod.Reporter
-        return Reporter
+        return self.override_class('REPORTER_LIB', 'Reporter', Reporter)
 
     @property
     def commandline(self):
@@ -89,13 +159,7 @@ class Template:
 
     @property
     def commandline_class(self):
-        for t in self.inheritance_tree:
-            if Path(t.COMMANDLINE_LIB).exists():
-                spec = importlib.util.spec_from_file_location("template_commandline", t.COMMANDLINE_LIB)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                return mod.Commandline
-        return Commandline
+        return self.override_class('COMMANDLINE_LIB', 'Commandline', Commandline)
 
     @property
     def report_manager(self):
@@ -103,13 +167,11 @@ class Template:
 
     @property
     def report_manager_class(self):
-        for t in self.inheritance_tree:
-            if Path(t.REPORT_MANAGER_LIB).exists():
-                spec = importlib.util.spec_from_file_location("template_report_manager", t.REPORT_MANAGER_LIB)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                return mod.ReportManager
-        return ReportManager
+        return self.override_class('REPORT_MANAGER_LIB', 'ReportManager', ReportManager)
+
+    def static_content_files(self):
+        """Paths of the static content files of the inheritance tree, whether or not they exist"""
+        return [os.path.join(t.STATIC_CONTENT_DIR, name) for t in self.inheritance_tree for name in [f"{self.language}.yaml", "general.yaml"]]
 
     def load_static_content(self):
         static_content = []
@@ -124,8 +186,15 @@ class Template:
 class Reporter:
     # Cache for content
     _content = None
-
-    def __init__(self, template=None, output_dir=join(config.get('cache_dir'), config.get('output_dir')), report_filename=config.get('report_output_file'), issue_dir=config.get('issue_dir'), report_dir=None):
+    # Issues loaded by another reporter of the same report, see generate_languages
+    preloaded_issues = None
+    # Issue slugs, severities and sections of a preview, see preview
+    only = None
+    preview_images = True
+    # Caches for parsed issues and evidences by path, shared by all instances in a process
+    _parse_caches = {}
+
+    def __init__(self, template=None, output_dir=join(config.get('cache_dir'), config.get('output_dir')), report_filename=config.get('report_output_file'), issue_dir=config.get('issue_dir'), report_dir=None, workers=config.getint('workers'), use_cache=True, shared_cache_dir=None):
         if template:
             self.template = template
         else:
@@ -136,10 +205,18 @@ class Reporter:
         else:
             self.root = find_report_root()
         self.output_dir = join(self.root, output_dir)
-        self.templates_output_dir = join(self.root, config.get('cache_dir'), config.get('templates_output_dir'))
+        self.cache_dir = join(self.root, config.get('cache_dir'))
+        self.templates_output_dir = join(self.cache_dir, config.get('templates_output_dir'))
+        self.manifest = join(self.cache_dir, BUILD_MANIFEST)
+        # Compiled templates do not depend on the report, so they can be shared between reports
+        self.shared_cache_dir = shared_cache_dir
+        self.bytecode_cache = join(shared_cache_dir or self.cache_dir, BYTECODE_CACHE_DIR)
         self.issue_dir = join(self.root, issue_dir)
         self.images_dir = join(self.root, 'images')
         self.output_file = join(self.output_dir, self.report_filename)
+        self.build_stamp = join(self.output_dir, BUILD_STAMP)
+        self.workers = workers
+        self.use_cache = use_cache
 
     @property
     def final_report_filename(self):
@@ -167,20 +244,58 @@ class Reporter:
         shutil.copy(src, dst + version + ext)
         self.write_issue_numbers()
 
-    def copy_files(self, dir, no_overwrite=[]):
-        for path in os.listdir(dir):
-            src = os.path.join(dir, path)
-            dst = os.path.join(self.output_dir, path)
-            if dst in no_overwrite:
-                continue
-            try:
-                shutil.copytree(src, dst, dirs_exist_ok=True)
-            except NotADirectoryError:
-                shutil.copy(src, dst)
-
-    def symlink_report_files(self):
+    def copy_files(self, dir, no_overwrite=[], sync_manifest=None):
+        """
+        Sync the files in dir to the output dir, only files that changed are copied
+
+        :return: List of output paths that were written or removed
+        """
+        manifest = sync_manifest or SyncManifest(join(self.cache_dir, SYNC_MANIFEST))
+        changed = manifest.sync([dir], self.output_dir, no_overwrite=no_overwrite)
+        if not sync_manifest:
+            manifest.save()
+        return changed
+
+    def render_issue_fragments(self, content, template_dirs, no_overwrite=[]):
+        """
+        Render the fragment of each issue to its own file, only fragments of which the content changed are written
+
+        :return: List of output paths that were written
+        """
+        for dir in template_dirs:
+            if Path(dir, ISSUE_FRAGMENT).exists():
+                break
+        else:
+            # The template does not use fragments
+            return []
+        fragment = get_latex_env(dir, self.bytecode_cache).get_template(ISSUE_FRAGMENT)
+        findings_dir = join(self.output_dir, FINDINGS_OUTPUT_DIR)
+        if findings_dir in no_overwrite:
+            raise Exception(f"Cannot render issues, the report contains a file or directory named {FINDINGS_OUTPUT_DIR}")
+        os.makedirs(findings_dir, exist_ok=True)
+        build_manifest = BuildManifest(self.manifest)
+        written = []
+        paths = set()
+        for issues in content['issues'].values():
+            for issue in issues:
+                output_path = join(findings_dir, f"{issue.slug}.tex")
+                paths.add(output_path)
+                if write_output_stream(output_path, fragment.generate(content, issue=issue), build_manifest):
+                    written.append(output_path)
+        # Remove fragments of issues that no longer exist
+        for path in os.listdir(findings_dir):
+            path = join(findings_dir, path)
+            if path not in paths:
+                os.remove(path)
+                written.append(path)
+        build_manifest.save()
+        return written
+
+    def symlink_report_files(self, excluded=[]):
         paths = []
         for path in os.listdir(self.root):
+            if path in excluded:
+                continue
             _, ext = os.path.splitext(path)
             if ext in [".tex", ".yaml"]:
                 # Do not symlink tex or yaml files, they are templated later
@@ -190,7 +305,10 @@ class Reporter:
                 # Don't symlink hidden files or the output dir
                 continue
             output_path = Path(os.path.join(self.output_dir, path))
-            if output_path.exists() and not output_path.is_symlink():
+            if output_path.is_dir() and not output_path.is_symlink():
+                # E.g. the directory with optimized images
+                shutil.rmtree(output_path)
+            elif output_path.exists() and not output_path.is_symlink():
                 # Remove file that is not the correct symlink
                 os.remove(output_path)
             if not output_path.is_symlink():
@@ -198,11 +316,38 @@ class Reporter:
             paths.append(output_path.__fspath__())
         return paths
 
+    def invalidate_build(self):
+        """Remove the stamp of the last successful build, returns whether there was one"""
+        try:
+            os.remove(self.build_stamp)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def mark_built(self):
+        with open(self.build_stamp, 'w'):
+            pass
+
+    def output_is_up_to_date(self, inputs):
+        """Check whether the report was compiled from the current output and is newer than all given input files (or directories)"""
+        if not os.path.exists(self.build_stamp):
+            return False
+        try:
+            output_mtime = os.stat(self.output_file).st_mtime
+        except FileNotFoundError:
+            return False
+        for path in inputs:
+            if os.stat(path).st_mtime > output_mtime:
+                return False
+            for dirpath, dnames, fnames in os.walk(path, followlinks=True):
+                for name in dnames + fnames:
+                    if os.stat(os.path.join(dirpath, name)).st_mtime > output_mtime:
+                        return False
+        return True
+
     def load_dynamic_content(self, content):
         try:
-            spec = importlib.util.spec_from_file_location("template_dynamic_text", self.template.DYNAMIC_TEXT_LIB)
-            mod = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(mod)
+            mod = self.template.load_module(self.template.DYNAMIC_TEXT_LIB)
             generator_class = mod.generators.get(self.template.language)
             generator = generator_class(content)
             generator.generate()
@@ -215,88 +360,154 @@ class Reporter:
         pass
 
     def get_issues(self):
-        yield from load_issues_with_evidences(self.issue_dir)
+        if self.preloaded_issues is not None:
+            # Copies, because issues are modified while processing the content
+            yield from (copy.deepcopy(issue) for issue in self.preloaded_issues)
+            return
+        yield from load_issues_with_evidences(self.issue_dir, workers=self.workers, cache=self.parse_cache)
+
+    @property
+    def parse_cache(self):
+        if not self.use_cache:
+            return None
+        path = join(self.cache_dir, ISSUE_CACHE)
+        if path not in Reporter._parse_caches:
+            Reporter._parse_caches[path] = ParseCache(path, use_hash=config.getboolean('cache_hash'))
+        return Reporter._parse_caches[path]
+
+    def set_issue_slugs(self, issues):
+        """Give each issue a stable slug based on its directory, used as file name of its fragment"""
+        taken = set()
+        for issue in issues:
+            relpath = os.path.relpath(os.path.dirname(issue.path), self.issue_dir)
+            slug = re.sub(r'[^A-Za-z0-9-]+', '-', relpath).strip('-') or "issue"
+            unique_slug = slug
+            i = 1
+            while unique_slug in taken:
+                i += 1
+                unique_slug = f"{slug}-{i}"
+            taken.add(unique_slug)
+            issue.slug = unique_slug
 
     def add_issues_and_stats(self, content):
-        issues = list(self.get_issues())
-        self.process_issues(content, issues)
-        content['issues'] = create_issue_dict(issues)
+        with phase("load issues"):
+            issues = list(self.get_issues())
+        self.set_issue_slugs(issues)
+        with phase("process issues"):
+            self.process_issues(content, issues)
+        with phase("number issues"):
+            content['issues'] = create_issue_dict(issues)
         content['num_issues'] = len(issues)
         content['num_severity'] = {k: len(v) for k, v in content['issues'].items()}
+        if self.only:
+            # Filter after numbering, so the issues of a preview keep their numbers
+            selected, _, matched_issues = select_issues(content['issues'], self.only)
+            if matched_issues:
+                content['issues'] = selected
 
     def add_config(self, content):
         content['config'] = config
 
+    def update_location_index(self, issues=[]):
+        """
+        Update the index of evidence locations and return all locations
+
+        :param issues: Issues of which the evidences are already loaded
+        """
+        evidences = {evidence['path']: evidence['location'] for issue in issues for evidence in issue.evidences}
+        return LocationIndex(join(self.cache_dir, LOCATION_INDEX)).update(self.issue_dir, evidences)
+
     def get_locations(self):
-        locations = set()
-        for _, evidences in find_issues_and_evidences(self.issue_dir):
-            for evidence in evidences:
-                evidence = load_evidence(evidence)
-                locations.add(evidence['location'])
-        return locations
+        return self.update_location_index()
+
+    def optimize_images(self):
+        """
+        Link optimized copies of the images into the output dir, instead of the images themselves
+
+        :return: List of output paths that changed
+        """
+        optimizer = ImageOptimizer(join(self.cache_dir, IMAGE_CACHE_DIR), width_cm=config.getfloat('image_width'), dpi=config.getint('image_dpi'), workers=self.workers)
+        return optimizer.optimize(self.images_dir, join(self.output_dir, os.path.basename(self.images_dir)))
 
     def get_images(self):
         for f in os.listdir(self.images_dir):
             if f.endswith('.png'):
                 yield f
 
-    def diff_standard_issues(self, show_diff=False):
-        standard_issues = {}
-        for standard_issue in self.template.report_manager.get_standard_issues(contents=True):
-            try:
-                standard_issues[standard_issue.title] = standard_issue
-            except AttributeError:
-                print(standard_issue)
-                raise
-
-        for issue in self.get_issues():
-            diff = None
-            standard_issue = standard_issues.get(issue.title)
+    def diff_standard_issues(self, show_diff=False, color=True):
+        """
+        Yield tuples (issue, reason, diff) for issues that are not a standard issue (reason is "new")
+        or that differ from their standard issue (reason is the list of different fields)
+        """
+        standard_issues = self.template.report_manager.get_standard_issues_by_title()
+
+        issues = [(issue, standard_issues.get(issue.title)) for issue in self.get_issues()]
+        compared = [(issue, standard_issue) for issue, standard_issue in issues if standard_issue]
+
+        # Check for differences with the standard issues
+        args = ([i for i, _ in compared], [s for _, s in compared], [show_diff] * len(compared), [color] * len(compared))
+        if self.workers <= 1 or len(compared) <= 1:
+            results = map(compare_issues, *args)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(compare_issues, *args, chunksize=max(1, len(compared) // (self.workers * 4)))
+        results = iter(list(results))
+
+        for issue, standard_issue in issues:
             if not standard_issue:
                 # The issue is not a standard issue
-                yield issue, "new", diff
-            else:
-                # Check for differences with the standard issue
-                differences = []
-                for k,v in issue.items():
-                    if k == 'label':
-                        continue
-                    try:
-                        if v != getattr(standard_issue, k):
-                            differences.append(k)
-                    except AttributeError:
-                        continue
-                if show_diff:
-                    p = subprocess.run(['diff', '-u', '--color=always', '-w', standard_issue.path, issue.path], capture_output= True)
-                    diff = p.stdout
-                if differences:
-                    yield issue, differences, diff
-                
+                yield issue, "new", None
+                continue
+            differences, diff = next(results)
+            if differences:
+                yield issue, differences, diff
+
+    def local_static_content_files(self):
+        return [os.path.join(self.root, path) for path in os.listdir(self.root) if path.endswith('.yaml')]
 
     def load_local_static_content(self):
         new_content = []
-        for path in os.listdir(self.root):
-            if not path.endswith('.yaml'):
-                continue
-            abs_path = os.path.join(self.root, path)
+        for abs_path in self.local_static_content_files():
             file_content = load_content(abs_path)
             new_content.append(file_content)
         return merge_dicts(new_content)
 
+    def load_template_static_content(self):
+        """Load the static content of the template, from a snapshot in the shared cache dir if it is set"""
+        if not self.shared_cache_dir or not self.use_cache:
+            return self.template.load_static_content()
+        sources = self.template.static_content_files()
+        name = STATIC_CONTENT_SNAPSHOT.format(key=hash_text("\n".join(sources))[:16])
+        return StaticContentSnapshot(join(self.shared_cache_dir, name)).load(sources, self.template.load_static_content)
+
+    def load_static_content(self):
+        """Load the static content of the template and the report, from the snapshot in the cache dir if none of the files changed"""
+        def load():
+            with phase("template static content"):
+                content = self.load_template_static_content()
+            with phase("local static content"):
+                return always_merger.merge(content, self.load_local_static_content())
+
+        if not self.use_cache:
+            return load()
+        sources = self.template.static_content_files() + self.local_static_content_files()
+        return StaticContentSnapshot(join(self.cache_dir, STATIC_CONTENT_CACHE.format(language=self.template.language))).load(sources, load)
+
     def get_content(self):
         # Load static content used for jinja templating
-        content = self.template.load_static_content()
-        local_content = self.load_local_static_content()
-        content = always_merger.merge(content, local_content)
+        with phase("static content"):
+            content = self.load_static_content()
 
         # Load issues from issue_dir and add to the jinja content
-        self.add_issues_and_stats(content)
+        with phase("issues"):
+            self.add_issues_and_stats(content)
 
         # Add config to the content object
         self.add_config(content)
 
         # Add dynamic content/text to the content object
-        self.load_dynamic_content(content)
+        with phase("dynamic content"):
+            self.load_dynamic_content(content)
 
         return content
 
@@ -306,39 +517,259 @@ class Reporter:
             self._content = self.get_content()
         return self._content
 
+    def export(self, format, output_file=None):
+        """
+        Export the issues in the given format without compiling the report
+
+        :param output_file: Path of the output file, or '-' for stdout. By default the file is stored next to the report.
+        """
+        issue_dict = self.content['issues']
+        if output_file == '-':
+            exporters[format](issue_dict, sys.stdout)
+            return
+        if not output_file:
+            name, _ = os.path.splitext(self.report_filename)
+            output_file = join(self.root, f"{name}.{format}")
+        with open(output_file, 'w', newline='') as f:
+            exporters[format](issue_dict, f)
+        print(f"Exported issues to {output_file}")
+
+    def run_make(self, env, stdout=None):
+        stderr = subprocess.STDOUT if stdout is not None else None
+        if stdout is None:
+            # Send the output to sys.stdout, which is the client connection when running in `reporter serve`
+            try:
+                stdout = sys.stdout.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                stdout = None
+            sys.stdout.flush()
+        return subprocess.run(['make', '-C', self.output_dir], env=env, stdout=stdout, stderr=stderr)
+
+    def build(self, stdout=None):
+        """Compile the preprocessed report with make"""
+        # Disable line wrapping in LaTeX output to make file names clickable in VS Code
+        env = os.environ.copy()
+        env['max_print_line'] = "10000"
+        make = self.run_make(env, stdout)
+
+        # Raise exception if make was not succesful
+        make.check_returncode()
+        self.mark_built()
+
     def generate(self, preprocess_only=False):
         """Generate a report"""
+        with phase("generate"):
+            self._generate(preprocess_only)
 
+    def _generate(self, preprocess_only=False):
+        changed, no_overwrite = self.preprocess()
+        if not preprocess_only:
+            if not changed and self.output_is_up_to_date(no_overwrite):
+                print("Report is up to date")
+                return
+
+            # Run make to compile the report
+            with phase("make"):
+                self.build()
+
+            # Copy the report from the output_dir to the current directory
+            copy_output(self.output_file, self.root)
+
+    def preprocess(self):
+        """
+        Render the report into the output dir
+
+        :return: Tuple of the output paths that changed and the report files that are linked into the output dir
+        """
         # Get content
-        content = self.content
+        with phase("content"):
+            content = self.content
+
+        # The output is about to change, so until it is compiled again (or nothing changed) the report is not up to date.
+        # Removing the stamp first also covers runs that fail or are interrupted after the manifests were saved.
+        built = self.invalidate_build()
+
+        # Keep the locations for shell completion up to date
+        with phase("location index"):
+            self.update_location_index([issue for issues in content['issues'].values() for issue in issues])
 
         # Create output dir
         os.makedirs(self.output_dir, exist_ok=True)
 
         # Make files from current dir accessible in output_dir
-        no_overwrite = self.symlink_report_files()
+        optimize_images = config.getboolean('optimize_images')
+        with phase("symlink report files"):
+            no_overwrite = self.symlink_report_files(excluded=[os.path.basename(self.images_dir)] if optimize_images else [])
+
+        changed = []
+        if optimize_images:
+            with phase("optimize images"):
+                changed += self.optimize_images()
 
         # Perform jinja templating using jinja context
-        template_dirs = [self.root] + [t.REPORT_TEMPLATE_DIR for t in self.template.inheritance_tree]
-        template(content, self.output_dir, template_dirs, no_overwrite=no_overwrite, excluded_dirs=[config.get('cache_dir'), '.git'], templates_output_dir=self.templates_output_dir)
+        template_dirs = self.template_dirs
+        with phase("templating"):
+            changed += template(content, self.output_dir, template_dirs, no_overwrite=no_overwrite, excluded_dirs=self.excluded_template_dirs, templates_output_dir=self.templates_output_dir, manifest=self.manifest, bytecode_cache=self.bytecode_cache)
+        with phase("issue fragments"):
+            changed += self.render_issue_fragments(content, template_dirs, no_overwrite=no_overwrite)
 
+        sync_manifest = SyncManifest(join(self.cache_dir, SYNC_MANIFEST))
         # Copy some necessary files (makefile, latex packages)
-        self.copy_files(NECESSARY_FILES_DIR, no_overwrite=no_overwrite)
+        with phase("necessary files"):
+            changed += self.copy_files(NECESSARY_FILES_DIR, no_overwrite=no_overwrite, sync_manifest=sync_manifest)
 
-        # Copy static images
-        for t in self.template.inheritance_tree[::-1]:
-            if Path(t.STATIC_IMAGES_DIR).exists():
-                shutil.copytree(t.STATIC_IMAGES_DIR, os.path.join(self.output_dir, STATIC_IMAGES_DIR), dirs_exist_ok=True)
+        # Copy static images, images of child templates override those of their parents
+        with phase("static images"):
+            changed += sync_manifest.sync([t.STATIC_IMAGES_DIR for t in self.template.inheritance_tree], os.path.join(self.output_dir, STATIC_IMAGES_DIR))
+        sync_manifest.save()
 
-        if not preprocess_only:
-            # Disable line wrapping in LaTeX output to make file names clickable in VS Code
-            env = os.environ.copy()
-            env['max_print_line'] = "10000"
-            # Run make to compile the report
-            make = subprocess.run(['make', '-C', self.output_dir], env=env)
+        if self.only:
+            with phase("preview"):
+                if self.apply_preview(content):
+                    changed.append(join(self.output_dir, config.get('report_file')))
 
-            # Raise exception if make was not succesful
-            make.check_returncode()
+        if built and not changed:
+            self.mark_built()
+        return changed, no_overwrite
 
-            # Copy the report from the output_dir to the current directory
-            copy_output(self.output_file, self.root)
+    @property
+    def template_dirs(self):
+        """Directories with the files that are rendered into the output dir, earlier directories override later ones"""
+        return [self.root] + [t.REPORT_TEMPLATE_DIR for t in self.template.inheritance_tree]
+
+    @property
+    def excluded_template_dirs(self):
+        return [config.get('cache_dir'), '.git', FRAGMENTS_DIR]
+
+    def sections(self):
+        """Names of the .tex files that are rendered next to the main file, without extension"""
+        files = cascade_map(self.template_dirs, self.excluded_template_dirs)
+        return [section_name(path) for path in files if os.path.dirname(path) == '' and path.endswith(".tex") and path != config.get('report_file')]
+
+    def apply_preview(self, content):
+        """Skip the sections that are not selected in the preview, returns whether the main file changed"""
+        _, sections, matched_issues = select_issues(content['issues'], self.only)
+        findings = [join(FINDINGS_OUTPUT_DIR, issue.slug) for issues in content['issues'].values() for issue in issues]
+        skipped = sections_to_skip(self.output_dir, config.get('report_file'), sections, findings if matched_issues else None)
+        return apply_preview_settings(join(self.output_dir, config.get('report_file')), preview_settings(skipped, not self.preview_images))
+
+    def preview(self, only, images=True, preprocess_only=False):
+        """
+        Generate a preview with only the given issues (by slug or severity) and sections (by file name) in a separate output dir
+
+        The issues keep the numbers they have in the full report. The preview is copied to <report>_preview.pdf.
+
+        :return: Path of the preview, or of the output dir if only preprocessing
+        """
+        reporter = self.template.reporter_class(self.template, output_dir=f"{self.output_dir}-preview", report_filename=self.report_filename,
+                                                issue_dir=self.issue_dir, report_dir=self.root, workers=self.workers, use_cache=self.use_cache,
+                                                shared_cache_dir=self.shared_cache_dir)
+        reporter.only = only
+        reporter.preview_images = images
+        # Check the selectors before anything is rendered
+        _, sections, _ = select_issues(reporter.content['issues'], only)
+        check_sections(sections, reporter.sections())
+        with phase("preprocess preview"):
+            changed, no_overwrite = reporter.preprocess()
+        if preprocess_only:
+            return reporter.output_dir
+        name, ext = os.path.splitext(self.report_filename)
+        output_file = join(self.root, f"{name}_preview{ext}")
+        if changed or not reporter.output_is_up_to_date(no_overwrite) or not os.path.exists(output_file):
+            with phase("make"):
+                reporter.build()
+            shutil.copy(reporter.output_file, output_file)
+        return output_file
+
+    def language_reporter(self, language, issues=None):
+        """Reporter for the same report in another language, with its own output dir"""
+        template = Template(self.template.name, language, **self.template.reporter_args)
+        reporter = template.reporter_class(template, output_dir=f"{self.output_dir}-{language}", report_filename=self.report_filename,
+                                           issue_dir=self.issue_dir, report_dir=self.root, workers=self.workers, use_cache=self.use_cache,
+                                           shared_cache_dir=self.shared_cache_dir)
+        reporter.preloaded_issues = issues
+        return reporter
+
+    def language_output_file(self, language):
+        name, ext = os.path.splitext(self.report_filename)
+        return join(self.root, f"{name}_{language}{ext}")
+
+    def generate_languages(self, languages, preprocess_only=False):
+        """
+        Generate the report in each of the given languages
+
+        Issues are loaded once, each language is rendered into its own output dir and the LaTeX builds run in parallel.
+        The output of each build is written to make.log in its output dir.
+
+        :return: Dict of language to the path of the report, or the error if generating failed
+        """
+        with phase("load issues"):
+            issues = list(self.get_issues())
+        results = {}
+        builds = []
+        for language in languages:
+            reporter = self.language_reporter(language, issues)
+            with phase(f"preprocess {language}"):
+                try:
+                    changed, no_overwrite = reporter.preprocess()
+                except Exception as e:
+                    results[language] = e
+                    continue
+            output_file = self.language_output_file(language)
+            if preprocess_only:
+                results[language] = reporter.output_dir
+            elif not changed and reporter.output_is_up_to_date(no_overwrite) and os.path.exists(output_file):
+                results[language] = output_file
+            else:
+                builds.append((language, reporter))
+
+        def build(language, reporter):
+            log = join(reporter.output_dir, "make.log")
+            # A failing language must not abort the builds of the other languages
+            try:
+                with open(log, 'w') as f:
+                    reporter.build(stdout=f)
+                shutil.copy(reporter.output_file, self.language_output_file(language))
+            except subprocess.CalledProcessError:
+                return language, Exception(f"make failed, see {log}")
+            except Exception as e:
+                return language, e
+            return language, self.language_output_file(language)
+
+        if builds:
+            with phase("make"), ThreadPoolExecutor(max_workers=len(builds)) as executor:
+                results.update(executor.map(lambda args: build(*args), builds))
+        return {language: results[language] for language in languages}
+
+    def watched_paths(self):
+        """Files that are watched for changes, as a list of tuples (directory, recursive, extensions)"""
+        paths = [
+            (self.issue_dir, True, None),
+            (self.images_dir, True, None),
+            (self.root, False, [".tex", ".yaml"]),
+        ]
+        for t in self.template.inheritance_tree:
+            paths.append((t.REPORT_TEMPLATE_DIR, True, None))
+            paths.append((t.STATIC_CONTENT_DIR, True, None))
+        return paths
+
+    def rebuild(self, changed, preprocess_only=False):
+        """Generate the report again after the given paths changed"""
+        for path in sorted(changed):
+            print(f"Changed: {os.path.relpath(path, self.root)}")
+        if any(path.startswith(self.issue_dir + os.sep) or path.endswith('.yaml') for path in changed):
+            # The content must be reloaded, unchanged issues are served from the parse cache
+            self._content = None
+        try:
+            self.generate(preprocess_only=preprocess_only)
+        except Exception as e:
+            print(e)
+
+    def watch(self, preprocess_only=False, debounce=0.5):
+        """Generate the report and generate it again whenever a watched file changes"""
+        try:
+            self.rebuild(set(), preprocess_only=preprocess_only)
+            print("Watching for changes")
+            watch(self.watched_paths(), lambda changed: self.rebuild(changed, preprocess_only=preprocess_only), debounce=debounce)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,69 @@
+import json
+import os
+import socket
+from contextlib import redirect_stdout, redirect_stderr
+from .client import SERVER_COMMANDS, STATUS_SEPARATOR, get_command
+
+
+class Server:
+    """
+    Build server for a single report that keeps the template, parsed issues and jinja environments in memory
+
+    Requests are JSON lines with the command line arguments and working directory of the client.
+    The output of the command is streamed back, followed by STATUS_SEPARATOR and a JSON object with the exit status.
+    Requests are handled one at a time, because builds of the same report cannot run concurrently.
+    """
+
+    def __init__(self, template, socket_path):
+        self.template = template
+        self.socket_path = socket_path
+
+    def handle(self, conn):
+        with conn.makefile('r') as f:
+            request = json.loads(f.readline())
+        argv = request['argv']
+        status = 0
+        # The arguments of a request only apply to that request
+        language, reporter_args = self.template.language, dict(self.template.reporter_args)
+        with conn.makefile('w') as out:
+            with redirect_stdout(out), redirect_stderr(out):
+                try:
+                    if get_command(argv) not in SERVER_COMMANDS:
+                        raise Exception(f"Command not supported by the server: {get_command(argv)}")
+                    os.chdir(request['cwd'])
+                    commandline = self.template.commandline_class(self.template)
+                    commandline.parse_args(argv)
+                except SystemExit as e:
+                    # Raised by argparse
+                    status = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(e)
+                    status = 1
+                finally:
+                    self.template.language = language
+                    self.template.reporter_args = reporter_args
+        conn.sendall(STATUS_SEPARATOR + json.dumps({"status": status}).encode())
+
+    def serve_forever(self):
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        print(f"Serving on {self.socket_path}")
+        try:
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    try:
+                        self.handle(conn)
+                    except (OSError, ValueError) as e:
+                        # The client disconnected or sent an invalid request
+                        print(e)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
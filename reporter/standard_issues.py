@@ -0,0 +1,104 @@
+import copy
+import logging
+import os
+import pickle
+from textile_parser import check_issue
+from .issues import Issue, load_issue_evidence
+from .util import hash_file
+from .config import STANDARD_ISSUE_DIR
+
+
+class StandardIssueIndex:
+    """
+    Persisted index of the standard issue library
+
+    Maps the path of each standard issue to its title, language, content hash and parsed fields.
+    Only files of which the content changed are parsed again, the hash is only compared when the mtime changed but the
+    size did not. Files that cannot be loaded are listed by paths(),
+    but are skipped by issues() and by_title().
+    """
+
+    def __init__(self, path, library_dir=STANDARD_ISSUE_DIR):
+        self.path = path
+        self.library_dir = library_dir
+        try:
+            with open(path, 'rb') as f:
+                self.entries = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.entries = {}
+
+    def load_entry(self, relpath, stat, digest=None):
+        abs_path = os.path.join(self.library_dir, relpath)
+        language, _, _ = os.path.basename(relpath).partition("_")
+        entry = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest or hash_file(abs_path),
+            'title': None,
+            'language': language,
+            'content': None,
+            'error': None,
+        }
+        try:
+            content = load_issue_evidence(abs_path)
+            check_issue(content)
+        except Exception as e:
+            logging.warning(f"Could not load standard issue {abs_path}: {e}")
+            entry['error'] = str(e)
+            return entry
+        entry['title'] = content.get('title')
+        entry['content'] = content
+        return entry
+
+    def update(self):
+        """Parse new and changed standard issues, evict removed ones and save the index if anything changed"""
+        entries = {}
+        changed = False
+        for folder, _, files in os.walk(self.library_dir):
+            for file in files:
+                if os.path.splitext(file)[1] != ".issue":
+                    continue
+                relpath = os.path.relpath(os.path.join(folder, file), self.library_dir)
+                stat = os.stat(os.path.join(folder, file))
+                entry = self.entries.get(relpath)
+                if not entry or (entry['mtime'], entry['size']) != (stat.st_mtime_ns, stat.st_size):
+                    digest = hash_file(os.path.join(folder, file)) if entry and entry['size'] == stat.st_size else None
+                    if digest and digest == entry.get('hash'):
+                        # Only the mtime changed, e.g. after a checkout
+                        entry = dict(entry, mtime=stat.st_mtime_ns)
+                    else:
+                        entry = self.load_entry(relpath, stat, digest)
+                    changed = True
+                entries[relpath] = entry
+        if entries.keys() != self.entries.keys():
+            changed = True
+        self.entries = entries
+        if changed:
+            self.save()
+        return self
+
+    def paths(self):
+        """Relative paths of all standard issues"""
+        return sorted(self.entries)
+
+    def issue(self, relpath):
+        """Return the standard issue at relpath as an Issue"""
+        content = copy.deepcopy(self.entries[relpath]['content'])
+        return Issue(content, path=os.path.join(self.library_dir, relpath))
+
+    def valid_paths(self):
+        """Relative paths of the standard issues that could be loaded"""
+        return [relpath for relpath in self.paths() if not self.entries[relpath].get('error')]
+
+    def issues(self):
+        for relpath in self.valid_paths():
+            yield self.issue(relpath)
+
+    def by_title(self):
+        """Dict of title to Issue"""
+        return {self.entries[relpath]['title']: self.issue(relpath) for relpath in self.valid_paths()}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'wb') as f:
+            pickle.dump(self.entries, f)
@@ -0,0 +1,63 @@
+import os
+import pickle
+from .util import hash_file
+
+
+class StaticContentSnapshot:
+    """
+    Merged static content of a report, stored as a pickle
+
+    The snapshot records the size, mtime and hash of every source file (or None if it does not exist).
+    It is used as long as the same sources are requested and none of them changed in content.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_valid(self, snapshot, sources):
+        if snapshot.get('sources') != list(sources):
+            return False
+        for path, record in zip(sources, snapshot['files']):
+            stat = self.stat(path)
+            if stat is None or record is None:
+                if stat != record:
+                    return False
+            elif stat != record[:2] and (stat[0] != record[0] or hash_file(path) != record[2]):
+                return False
+        return True
+
+    def load(self, sources, loader):
+        """
+        Return the snapshot of the given source files, or call loader and store its result if there is no valid snapshot
+
+        :param sources: Paths of the files the content is loaded from, including files that may not exist
+        :param loader: Function that loads and merges the content of the sources
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if self.is_valid(snapshot, sources):
+                return snapshot['content']
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError):
+            pass
+        # Record the files before loading, so changes during loading invalidate the snapshot
+        files = []
+        for path in sources:
+            stat = self.stat(path)
+            files.append(stat and stat + [hash_file(path)])
+        content = loader()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Unique per process, snapshots in a shared cache dir can be written by multiple processes at once
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump({'sources': list(sources), 'files': files, 'content': content}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        return content
@@ -1,11 +1,16 @@
 from pathlib import Path
 import os
 import re
+import time
+import json
 import shutil
+import hashlib
+import difflib
+from functools import lru_cache
+from collections import deque
 from importlib.metadata import version
 from dataclasses import dataclass
-from jinja2 import Environment, FileSystemLoader
-from jinja2 import StrictUndefined
+from .profiling import phase
 
 reporter_version = version('reporter')
 
@@ -39,33 +44,146 @@ class CascadedFile:
     # Filename
     fname: str
 
+def scan_directory(dir, excluded=[]):
+    """
+    List the files in dir recursively, excluded directories are pruned before descending into them
+
+    Like os.walk, symlinks to directories are not followed.
+
+    :param excluded: Relative paths from dir, these directories and the directories in them are skipped
+    :return: (list of (relpath, dirpath, fnames), dict of dirpath to mtime of all scanned directories)
+    """
+    excluded = [os.path.normpath(e) for e in excluded]
+    listing = []
+    mtimes = {}
+    pending = deque([(".", dir)])
+    while pending:
+        relpath, dirpath = pending.popleft()
+        try:
+            mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            entries = sorted(os.scandir(dirpath), key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            mtimes[dirpath] = None
+            continue
+        fnames = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                fnames.append(entry.name)
+                continue
+            if entry.is_symlink():
+                continue
+            subpath = os.path.normpath(os.path.join(relpath, entry.name))
+            # Compare whole path components, so excluding "fragments" does not exclude "fragments_appendix"
+            if any(subpath == e or subpath.startswith(e + os.sep) for e in excluded):
+                continue
+            pending.append((subpath, entry.path))
+        listing.append((relpath, dirpath, fnames))
+    return listing, mtimes
+
+
+# Resolved cascades by (directories, excluded), with the mtimes of the scanned directories
+_cascades = {}
+# Directories modified less than this long (in ns) before a scan may still change within the same mtime on
+# filesystems with coarse timestamps, so such scans are not cached
+RACY_MTIME = 1_000_000_000
+
+
+def cascade_map(directories, excluded=[]):
+    """
+    Return a dict of relative file path to the CascadedFile that wins for that path
+
+    Files in earlier directories override files in later directories. The map is cached in the process and is only
+    rebuilt when the mtime of one of the scanned directories changed, i.e. when files were added, removed or renamed.
+    """
+    key = (tuple(directories), tuple(excluded))
+    cached = _cascades.get(key)
+    if cached:
+        files, mtimes = cached
+        if all(directory_mtime(dirpath) == mtime for dirpath, mtime in mtimes.items()):
+            return files
+    files = {}
+    mtimes = {}
+    started = time.time_ns()
+    for dir in directories:
+        listing, dir_mtimes = scan_directory(dir, excluded)
+        mtimes.update(dir_mtimes)
+        for relpath, dirpath, fnames in listing:
+            for f in fnames:
+                files.setdefault(os.path.normpath(os.path.join(relpath, f)), CascadedFile(
+                    dir=dir, relpath=relpath, dirpath=dirpath, fname=f
+                ))
+    if all(mtime is None or mtime < started - RACY_MTIME for mtime in mtimes.values()):
+        _cascades[key] = (files, mtimes)
+    else:
+        _cascades.pop(key, None)
+    return files
+
+
+def directory_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
 def cascade_directories(directories, excluded=[]):
     """
     Return files from a list of directories, where files in later directories are fallbacks if a file is not found in an earlier directory
     
     :return: generator(CascadedFile)
     """
-    processed = set()
-    def should_exclude(relpath):
-        for e in excluded:
-            if relpath.startswith(e):
-                return True
-        return False
+    yield from cascade_map(directories, excluded).values()
+
+
+class WhitespaceInsensitiveLine(str):
+    """Line that compares equal to lines that only differ in whitespace, like diff -w"""
+
+    def __new__(cls, line):
+        obj = super().__new__(cls, line)
+        obj.key = re.sub(r'\s+', '', line)
+        return obj
+
+    def __eq__(self, other):
+        return self.key == getattr(other, 'key', other)
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+# Colors used by diff --color
+DIFF_COLORS = {
+    '---': '\033[1m',
+    '+++': '\033[1m',
+    '@@': '\033[36m',
+    '-': '\033[31m',
+    '+': '\033[32m',
+}
+
+
+def color_diff_line(line):
+    for prefix, color in DIFF_COLORS.items():
+        if line.startswith(prefix):
+            return f"{color}{line.rstrip(chr(10))}\033[m\n"
+    return line
 
-    for dir in directories:
-        for dirpath, dnames, fnames in os.walk(dir):
-            relpath = os.path.relpath(dirpath, dir)
-            if should_exclude(relpath):
-                continue
-            for f in fnames:
-                key = (relpath, f)
-                if key in processed:
-                    continue
-                else:
-                    processed.add(key)
-                    yield CascadedFile(
-                        dir=dir, relpath=relpath, dirpath=dirpath, fname=f
-                    )
+
+def unified_diff(a_path, b_path, color=False):
+    """Return the unified diff of two files, ignoring whitespace (like diff -u -w)"""
+    with open(a_path) as f:
+        a = [WhitespaceInsensitiveLine(line) for line in f]
+    with open(b_path) as f:
+        b = [WhitespaceInsensitiveLine(line) for line in f]
+    lines = []
+    for line in difflib.unified_diff(a, b, fromfile=a_path, tofile=b_path):
+        line = str(line)
+        if not line.endswith('\n'):
+            line += '\n'
+        lines.append(color_diff_line(line) if color else line)
+    return ''.join(lines)
 
 
 def slugify(filename):
@@ -73,9 +191,28 @@ def slugify(filename):
     return re.sub(disallowed, "_", filename)
 
 
-def get_latex_env(template_dir):
+@lru_cache(maxsize=None)
+def get_env(template_dir):
+    """Get a jinja environment with the default syntax, shared for the whole process"""
+    # jinja is imported when it is needed, so commands that are sent to `reporter serve` start fast
+    from jinja2 import Environment, FileSystemLoader
+    return Environment(loader=FileSystemLoader(template_dir))
+
+
+@lru_cache(maxsize=None)
+def get_latex_env(template_dir, bytecode_cache=None):
+    """
+    Get a jinja environment with LaTeX-friendly syntax, shared for the whole process
+
+    :param bytecode_cache: Directory to store compiled templates in, entries are invalidated when the template source changes.
+    """
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, StrictUndefined
+    if bytecode_cache:
+        os.makedirs(bytecode_cache, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache)
     return Environment(
         loader=FileSystemLoader(template_dir),
+        bytecode_cache=bytecode_cache,
         block_start_string=r'\BLOCK{',
         block_end_string='}',
         variable_start_string=r'\VAR{',
@@ -89,12 +226,244 @@ def get_latex_env(template_dir):
         undefined=StrictUndefined)
 
 
-def template(content, output_dir, template_dirs, no_overwrite=[], extensions=[".tex", ".cls"], templates_output_dir=None, excluded_dirs=[]):
+def hash_text(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class BuildManifest:
+    """
+    Content hashes of generated output files, stored as JSON.
+
+    Used to avoid rewriting output files whose content did not change, such that their mtime is preserved.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.hashes = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.hashes = {}
+
+    def key(self, output_path):
+        # Relative to the manifest, so the report directory can be moved
+        return os.path.relpath(os.path.realpath(output_path), os.path.dirname(os.path.realpath(self.path)))
+
+    def is_changed(self, output_path, digest):
+        if not os.path.exists(output_path):
+            return True
+        key = self.key(output_path)
+        if key not in self.hashes:
+            # Unknown file, compare against the contents on disk
+            self.hashes[key] = hash_file(output_path)
+        return self.hashes[key] != digest
+
+    def update(self, output_path, digest):
+        self.hashes[self.key(output_path)] = digest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.hashes, f, indent=1, sort_keys=True)
+
+
+# Rendered chunks are collected into blocks of about this many characters before they are hashed and written
+STREAM_BLOCK_SIZE = 1 << 16
+
+
+def write_output_stream(output_path, chunks, build_manifest=None):
+    """
+    Write the chunks of text to output_path without holding the whole text in memory
+
+    Output larger than STREAM_BLOCK_SIZE is written to a temporary file while it is rendered. The output replaces
+    output_path only when all chunks were rendered, and only if the build manifest shows that the content changed.
+
+    :return: Whether the file was written
+    """
+    digest = hashlib.sha256()
+    tmp = f"{output_path}.{os.getpid()}.tmp"
+    f = None
+    block = []
+    size = 0
+    try:
+        for chunk in chunks:
+            block.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_BLOCK_SIZE:
+                if not f:
+                    f = open(tmp, 'w')
+                text = "".join(block)
+                digest.update(text.encode())
+                f.write(text)
+                block = []
+                size = 0
+        text = "".join(block)
+        digest.update(text.encode())
+        if f:
+            f.write(text)
+            f.close()
+    except BaseException:
+        if f:
+            f.close()
+            os.remove(tmp)
+        raise
+    if build_manifest:
+        if not build_manifest.is_changed(output_path, digest.hexdigest()):
+            if f:
+                os.remove(tmp)
+            return False
+        build_manifest.update(output_path, digest.hexdigest())
+    if not f:
+        # Small output, still in memory
+        with open(tmp, 'w') as f:
+            f.write(text)
+    os.replace(tmp, output_path)
+    return True
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ioctl to clone a file on copy-on-write filesystems (btrfs, xfs), see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
+
+def reflink(src, dst):
+    """Create dst as a copy-on-write clone of src, returns False if this is not supported"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def link_or_copy(src, dst):
+    """Replace dst by a hardlink to src, a reflink or a copy, whatever is possible first"""
+    tmp = f"{dst}.sync-tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        # Other filesystem, or hardlinks are not allowed
+        if not reflink(src, tmp):
+            shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def is_synced(src, dst):
+    """Check whether dst has the same content as src, comparing size and mtime first and the contents if only the mtime differs"""
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+    if hash_file(src) != hash_file(dst):
+        return False
+    # Same content, align the mtime so the next check does not need to read the files
+    os.utime(dst, ns=(dst_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return True
+
+
+class SyncManifest:
+    """
+    Files that were synced to output directories with the size and mtime of their source, stored as JSON
+
+    Used to remove files from the output when they are removed from the source directories. Files are recorded per
+    destination and set of source directories, so syncing other sources into the same destination leaves them alone.
+    Sources are compared against the manifest as well as against the output, because an in-place edit of a
+    hardlinked source changes the output too, but should still be reported as a change.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.synced = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.synced = {}
+
+    def sync(self, src_dirs, dst_dir, no_overwrite=[]):
+        """
+        Make dst_dir contain the files of src_dirs, only files that changed are copied
+
+        Files in earlier src_dirs override files in later src_dirs, like in cascade_directories.
+        Files synced before that no longer exist in any of the src_dirs are removed from dst_dir.
+
+        :return: List of output paths that were written or removed
+        """
+        dst_key = self.key(dst_dir)
+        src_key = os.pathsep.join(self.key(dir) for dir in src_dirs)
+        # Files synced into dst_dir by each set of source directories
+        sources = {key: files for key, files in self.synced.get(dst_key, {}).items() if isinstance(files, dict)}
+        no_overwrite = [os.path.normpath(path) for path in no_overwrite]
+
+        def is_protected(dst):
+            return any(dst == path or dst.startswith(path + os.sep) for path in no_overwrite)
+
+        previous = sources.get(src_key, {})
+        changed = []
+        synced = {}
+        for f in cascade_directories([dir for dir in src_dirs if os.path.isdir(dir)]):
+            relpath = os.path.normpath(os.path.join(f.relpath, f.fname))
+            dst = os.path.join(dst_dir, relpath)
+            if is_protected(dst):
+                continue
+            src = os.path.join(f.dirpath, f.fname)
+            src_stat = os.stat(src)
+            synced[relpath] = [src_stat.st_size, src_stat.st_mtime_ns]
+            if previous.get(relpath) == synced[relpath] and is_synced(src, dst):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            link_or_copy(src, dst)
+            changed.append(dst)
+        # Files that are still synced from other sources
+        owned_by_others = {relpath for key, files in sources.items() if key != src_key for relpath in files}
+        for relpath in previous.keys() - synced.keys() - owned_by_others:
+            dst = os.path.join(dst_dir, relpath)
+            if not is_protected(dst) and os.path.lexists(dst):
+                os.remove(dst)
+                changed.append(dst)
+        sources[src_key] = synced
+        self.synced[dst_key] = sources
+        return changed
+
+    def key(self, path):
+        # Relative to the manifest, so the report directory can be moved
+        return os.path.relpath(os.path.realpath(path), os.path.dirname(os.path.realpath(self.path)))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.synced, f, indent=1, sort_keys=True)
+
+
+def template(content, output_dir, template_dirs, no_overwrite=[], extensions=[".tex", ".cls"], templates_output_dir=None, excluded_dirs=[], manifest=None, bytecode_cache=None):
     """ For each unique path in template_dirs read it, perform jinja templating and write to output dir
 
         :param template_dirs: List of template_directories, files in later directories are fallbacks in case the filename does not exist in earlier template_dirs.
             (So, earlier directories override later directories)
+        :param manifest: Path of a build manifest, if given only files of which the rendered content changed are written.
+        :param bytecode_cache: Directory to cache compiled templates in.
+        :return: List of output paths that were written
     """
+    build_manifest = BuildManifest(manifest) if manifest else None
+    written = []
     if templates_output_dir:
         os.makedirs(templates_output_dir, exist_ok=True)
     for f in cascade_directories(template_dirs, excluded_dirs):
@@ -117,8 +486,11 @@ def template(content, output_dir, template_dirs, no_overwrite=[], extensions=[".
             dst_path = os.path.normpath(os.path.join(templates_output_dir, path))
             os.makedirs(os.path.join(templates_output_dir, f.relpath), exist_ok=True)
             shutil.copy(src_path, dst_path)
-        env = get_latex_env(f.dir)
-        template = env.get_template(path)
-        rendered = template.render(content)
-        with open(output_path, 'w') as f:
-            f.write(rendered)
+        with phase(os.path.normpath(path)):
+            env = get_latex_env(f.dir, bytecode_cache)
+            template = env.get_template(path)
+            if write_output_stream(output_path, template.generate(content), build_manifest):
+                written.append(os.fspath(output_path))
+    if build_manifest:
+        build_manifest.save()
+    return written
@@ -0,0 +1,149 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+
+# inotify event masks, see inotify(7)
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+
+
+def watched_dirs(targets):
+    """
+    Yield all directories of the given targets
+
+    :param targets: List of tuples (directory, recursive, extensions)
+    """
+    for dir, recursive, _ in targets:
+        if not os.path.isdir(dir):
+            continue
+        if not recursive:
+            yield dir
+            continue
+        for dirpath, _, _ in os.walk(dir):
+            yield dirpath
+
+
+def snapshot(targets):
+    """
+    Return a dict of path to (mtime, size) for all files of the given targets
+
+    :param targets: List of tuples (directory, recursive, extensions), if extensions is None all files are included
+    """
+    state = {}
+    for dir, recursive, extensions in targets:
+        if not os.path.isdir(dir):
+            continue
+        for dirpath, dnames, fnames in os.walk(dir):
+            if not recursive:
+                dnames.clear()
+            for fname in fnames:
+                if extensions and os.path.splitext(fname)[1] not in extensions:
+                    continue
+                path = os.path.join(dirpath, fname)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+class PollingWatcher:
+    """Watcher that reports possible changes every interval"""
+
+    def __init__(self, targets, interval=1.0):
+        self.targets = targets
+        self.interval = interval
+
+    def refresh(self):
+        pass
+
+    def wait(self, timeout=None):
+        """Wait until something may have changed, returns False if the timeout passed"""
+        if timeout is not None and timeout < self.interval:
+            time.sleep(timeout)
+            return False
+        time.sleep(self.interval)
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watcher that uses inotify (Linux only), directories are watched non-recursively so each directory gets its own watch"""
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.refresh()
+
+    def refresh(self):
+        """Add watches for all (new) directories, adding an existing watch again is a no-op"""
+        for dir in watched_dirs(self.targets):
+            self.libc.inotify_add_watch(self.fd, os.fsencode(dir), WATCH_MASK)
+
+    def wait(self, timeout=None):
+        """Wait until an event is received, returns False if the timeout passed"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the pending events, the changes themselves are found by comparing snapshots
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_watcher(targets):
+    try:
+        return InotifyWatcher(targets)
+    except (OSError, AttributeError):
+        # No inotify on this platform
+        return PollingWatcher(targets)
+
+
+def watch(targets, callback, debounce=0.5):
+    """
+    Call callback with the set of changed paths whenever files of the given targets change
+
+    Bursts of changes within the debounce time are combined into a single call.
+
+    :param targets: List of tuples (directory, recursive, extensions)
+    """
+    watcher = get_watcher(targets)
+    state = snapshot(targets)
+    try:
+        while True:
+            watcher.wait()
+            while watcher.wait(timeout=debounce):
+                pass
+            # Watch new directories before the snapshot, also when they are still empty, so files that are added
+            # to them later are noticed
+            watcher.refresh()
+            new_state = snapshot(targets)
+            changed = {path for path in state.keys() | new_state.keys() if state.get(path) != new_state.get(path)}
+            state = new_state
+            if changed:
+                callback(changed)
+    finally:
+        watcher.close()
@@ -0,0 +1,41 @@
+import os
+from reporter.batch import find_report_roots
+
+
+def create_root(path):
+    os.makedirs(os.path.join(path, "issues"))
+    with open(os.path.join(path, "reporter.ini"), 'w') as f:
+        f.write("[report]\n")
+
+
+def test_find_report_roots(tmp_path):
+    create_root(str(tmp_path / "client-a" / "pentest"))
+    create_root(str(tmp_path / "client-b"))
+    # Not a report root
+    os.makedirs(str(tmp_path / "client-c" / "notes"))
+    # Hidden directories and directories inside reports are skipped
+    create_root(str(tmp_path / ".trash" / "old"))
+    create_root(str(tmp_path / "client-b" / "issues" / "nested"))
+
+    assert find_report_roots([str(tmp_path), str(tmp_path / "client-b")]) == [
+        os.path.realpath(tmp_path / "client-a" / "pentest"),
+        os.path.realpath(tmp_path / "client-b"),
+    ]
+
+
+def test_batch_generate_forwards_language(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from reporter import batch
+    from reporter.commandline import Commandline
+    create_root(str(tmp_path / "client-a"))
+    calls = []
+    monkeypatch.setattr(batch, "batch_generate", lambda roots, argv, parallel: calls.append(argv) or [])
+    template = SimpleNamespace(language="en", reporter_args={})
+    commandline = Commandline(template)
+
+    commandline.parse_args(["batch-generate", str(tmp_path)])
+    assert "--language" not in calls[-1]
+    assert template.language == "en"
+
+    commandline.parse_args(["batch-generate", "-l", "nl", str(tmp_path)])
+    assert calls[-1][-2:] == ["--language", "nl"]
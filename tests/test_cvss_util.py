@@ -0,0 +1,20 @@
+from reporter.cvss_util import vector_to_scores, vector_to_score, score_vectors
+
+HIGH = "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N"
+NONE = "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:N/I:N/A:N"
+
+
+def test_vector_to_scores():
+    scores = vector_to_scores(HIGH)
+    assert float(scores.base) == 7.5
+    assert scores.environmental == vector_to_score(HIGH)
+    assert scores.severity == "high"
+    assert vector_to_scores(NONE).severity == "none"
+
+
+def test_score_vectors():
+    vector_to_scores.cache_clear()
+    scores = score_vectors([HIGH, NONE, HIGH])
+    assert set(scores) == {HIGH, NONE}
+    assert scores[HIGH] == vector_to_scores(HIGH)
+    assert vector_to_scores.cache_info().misses == 2
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+from reporter.issues import Issue
+from reporter.reporter import create_issue_dict
+from reporter.export import export_csv, export_json, export_jsonl
+
+
+def create_issues():
+    issues = []
+    for title, vector in [("Low", "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N"),
+                          ("High", "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N")]:
+        issue = Issue({"title": title, "cvss_vector": vector, "description": "", "solution": ""}, path=f"{title}.dradis")
+        issue.evidences = [{"location": "host1", "output": ""}, {"location": "host1", "output": ""}, {"location": "host2", "output": ""}]
+        issues.append(issue)
+    return create_issue_dict(issues)
+
+
+def test_export_csv():
+    f = io.StringIO()
+    export_csv(create_issues(), f)
+    rows = list(csv.DictReader(io.StringIO(f.getvalue())))
+    assert [(row['number'], row['title'], row['severity'], row['cvss_score']) for row in rows] == [
+        ("1", "High", "high", "7.5"),
+        ("2", "Low", "medium", "5.3"),
+    ]
+    assert rows[0]['location'] == "host1, host2"
+
+
+def test_export_json():
+    f = io.StringIO()
+    export_json(create_issues(), f)
+    records = json.loads(f.getvalue())
+    f = io.StringIO()
+    export_jsonl(create_issues(), f)
+    assert records == [json.loads(line) for line in f.getvalue().splitlines()]
+    assert [record['number'] for record in records] == [1, 2]
+    assert records[0]['cvss_score'] == 7.5
+    assert records[0]['locations'] == ["host1", "host2"]
@@ -0,0 +1,52 @@
+import os
+import pytest
+from reporter.images import ImageOptimizer
+
+
+def test_link_only_changes_outdated_links(tmp_path):
+    output_dir = str(tmp_path / "output")
+    a, b = str(tmp_path / "a.png"), str(tmp_path / "b.png")
+    assert sorted(ImageOptimizer.link({"a.png": a, os.path.join("sub", "b.png"): b}, output_dir)) == [
+        os.path.join(output_dir, "a.png"),
+        os.path.join(output_dir, "sub", "b.png"),
+    ]
+    assert ImageOptimizer.link({"a.png": a, os.path.join("sub", "b.png"): b}, output_dir) == []
+    assert ImageOptimizer.link({"a.png": b}, output_dir) == [os.path.join(output_dir, "a.png"), os.path.join(output_dir, "sub", "b.png")]
+    assert os.listdir(output_dir) == ["a.png"]
+    assert os.readlink(os.path.join(output_dir, "a.png")) == b
+
+
+def test_images_are_optimized_once(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    images_dir = str(tmp_path / "images")
+    output_dir = str(tmp_path / "output" / "images")
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(images_dir)
+    Image.new("RGB", (4000, 1000), "white").save(os.path.join(images_dir, "screenshot.png"))
+    with open(os.path.join(images_dir, "diagram.pdf"), 'w') as f:
+        f.write("pdf")
+
+    optimizer = ImageOptimizer(cache_dir, width_cm=2.54, dpi=100)
+    assert len(optimizer.optimize(images_dir, output_dir)) == 2
+    with Image.open(os.path.join(output_dir, "screenshot.png")) as image:
+        assert image.size == (100, 25)
+    assert os.readlink(os.path.join(output_dir, "diagram.pdf")) == os.path.realpath(os.path.join(images_dir, "diagram.pdf"))
+
+    optimized = os.listdir(cache_dir)
+    assert ImageOptimizer(cache_dir, width_cm=2.54, dpi=100).optimize(images_dir, output_dir) == []
+    assert os.listdir(cache_dir) == optimized
+
+
+def test_unused_optimized_images_are_removed(tmp_path):
+    images_dir = str(tmp_path / "images")
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(images_dir)
+    os.makedirs(cache_dir)
+    with open(os.path.join(images_dir, "diagram.pdf"), 'w') as f:
+        f.write("pdf")
+    stale = os.path.join(cache_dir, "0123-630-150.png")
+    with open(stale, 'w') as f:
+        f.write("removed image")
+
+    ImageOptimizer(cache_dir).optimize(images_dir, str(tmp_path / "output"))
+    assert os.listdir(cache_dir) == ["index.json"]
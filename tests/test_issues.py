@@ -0,0 +1,84 @@
+import os
+import shutil
+import pytest
+from reporter.issues import load_issues_with_evidences, load_issue, ParseCache
+
+ISSUE = """#[Title]#
+{title}
+
+#[CVSSv3Vector]#
+{cvss_vector}
+
+#[Type]#
+External
+
+#[Description]#
+Description of {title}
+
+#[Solution]#
+Solution of {title}
+
+#[References]#
+"""
+
+EVIDENCE = """#[Location]#
+{location}
+
+#[Output]#
+Output of {location}
+"""
+
+
+def create_issue_dir(issue_dir, name, cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N", locations=("localhost",)):
+    path = os.path.join(issue_dir, name)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "issue.dradis"), 'w') as f:
+        f.write(ISSUE.format(title=name, cvss_vector=cvss_vector))
+    for i, location in enumerate(locations):
+        with open(os.path.join(path, f"evidence{i}.dradis"), 'w') as f:
+            f.write(EVIDENCE.format(location=location))
+    return path
+
+
+def test_parallel_loading_keeps_order(tmp_path):
+    issue_dir = str(tmp_path)
+    for i in range(10):
+        create_issue_dir(issue_dir, f"issue{i}", locations=[f"host{i}", f"other{i}"])
+    sequential = [(issue.title, issue.evidences) for issue in load_issues_with_evidences(issue_dir)]
+    parallel = [(issue.title, issue.evidences) for issue in load_issues_with_evidences(issue_dir, workers=3)]
+    assert len(sequential) == 10
+    assert sequential == parallel
+
+
+def test_raw_content_is_parsed_on_write_back(tmp_path):
+    path = create_issue_dir(str(tmp_path), "issue")
+    issue = load_issue(os.path.join(path, "issue.dradis"))
+    assert issue._raw_content is None
+    issue.number = 3
+    issue.write_back(['number'])
+    assert 'raw_content' not in issue.content
+    assert load_issue(issue.path).number == 3
+
+
+def test_parse_cache(tmp_path):
+    issue_dir = str(tmp_path / "issues")
+    cache_file = str(tmp_path / "cache" / "issues.pickle")
+    create_issue_dir(issue_dir, "first")
+    second = create_issue_dir(issue_dir, "second", locations=["old"])
+    list(load_issues_with_evidences(issue_dir, cache=ParseCache(cache_file)))
+    assert len(ParseCache(cache_file).entries) == 4
+
+    create_issue_dir(issue_dir, "second", locations=["a new location"])
+    issues = list(load_issues_with_evidences(issue_dir, cache=ParseCache(cache_file)))
+    assert issues[1].evidences[0]['location'] == "a new location"
+
+    shutil.rmtree(second)
+    list(load_issues_with_evidences(issue_dir, cache=ParseCache(cache_file)))
+    assert len(ParseCache(cache_file).entries) == 2
+
+
+def test_invalid_cvss_vector_fails_on_load(tmp_path):
+    issue_dir = str(tmp_path)
+    create_issue_dir(issue_dir, "issue", cvss_vector="CVSS:3.1/AV:X")
+    with pytest.raises(Exception, match="has an invalid CVSS vector"):
+        list(load_issues_with_evidences(issue_dir))
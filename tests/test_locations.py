@@ -0,0 +1,26 @@
+import os
+from reporter.locations import LocationIndex
+from test_issues import create_issue_dir
+
+
+def test_location_index(tmp_path):
+    issue_dir = str(tmp_path / "issues")
+    index_file = str(tmp_path / "cache" / "locations.json")
+    create_issue_dir(issue_dir, "first", locations=["host1", "host2"])
+    second = create_issue_dir(issue_dir, "second", locations=["host3"])
+    assert LocationIndex(index_file).update(issue_dir) == {"host1", "host2", "host3"}
+
+    create_issue_dir(issue_dir, "second", locations=["host4"])
+    # Locations of loaded evidences are used instead of parsing them
+    evidences = {os.path.join(second, "evidence0.dradis"): "loaded"}
+    assert LocationIndex(index_file).update(issue_dir, evidences) == {"host1", "host2", "loaded"}
+
+
+def test_location_index_skips_broken_evidence(tmp_path):
+    issue_dir = str(tmp_path / "issues")
+    index_file = str(tmp_path / "cache" / "locations.json")
+    create_issue_dir(issue_dir, "first", locations=["host1"])
+    broken = create_issue_dir(issue_dir, "broken", locations=["host2"])
+    with open(os.path.join(broken, "evidence.yaml"), 'w') as f:
+        f.write("location: [")
+    assert LocationIndex(index_file).update(issue_dir, strict=False) == {"host1"}
@@ -0,0 +1,52 @@
+import os
+from collections import OrderedDict
+from types import SimpleNamespace
+import pytest
+from reporter.preview import select_issues, sections_to_skip, preview_settings, apply_preview_settings
+
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def create_output(output_dir):
+    write(os.path.join(output_dir, "report.tex"), "\\documentclass{pentest}\n\\begin{document}\n\\input{issues.tex}\n\\input{conclusion.tex}\n\\end{document}\n")
+    write(os.path.join(output_dir, "prequel_sections.tex"), "\\input{management_summary.tex}\n\\input{results.tex}\n")
+    write(os.path.join(output_dir, "issues.tex"), "\\input{findings/first}\n")
+    for name in ["management_summary", "results", "conclusion"]:
+        write(os.path.join(output_dir, name + ".tex"), name)
+
+
+def test_select_issues():
+    issues = OrderedDict([("high", [SimpleNamespace(slug="sqli", number=1)]), ("low", [SimpleNamespace(slug="banner", number=2)])])
+    selected, sections, matched_issues = select_issues(issues, ["banner", "conclusion"])
+    assert [(severity, [issue.number for issue in issues]) for severity, issues in selected.items()] == [("high", []), ("low", [2])]
+    assert sections == ["conclusion"]
+    assert matched_issues
+    assert select_issues(issues, ["critical"])[2]
+    assert not select_issues(issues, ["conclusion"])[2]
+
+
+def test_sections_to_skip_keeps_containers(tmp_path):
+    output_dir = str(tmp_path)
+    create_output(output_dir)
+    assert sections_to_skip(output_dir, "report.tex", ["results"]) == ["conclusion", "issues", "management_summary"]
+    assert sections_to_skip(output_dir, "report.tex", [], ["findings/first"]) == ["conclusion", "management_summary", "prequel_sections", "results"]
+    with pytest.raises(Exception):
+        sections_to_skip(output_dir, "report.tex", ["appendix"])
+
+
+def test_apply_preview_settings_replaces_earlier_settings(tmp_path):
+    output_dir = str(tmp_path)
+    create_output(output_dir)
+    main = os.path.join(output_dir, "report.tex")
+    assert apply_preview_settings(main, preview_settings(["conclusion"], draft_images=True))
+    assert not apply_preview_settings(main, preview_settings(["conclusion"], draft_images=True))
+    assert apply_preview_settings(main, preview_settings(["issues"], draft_images=False))
+    with open(main) as f:
+        text = f.read()
+    assert "reporter@skip@issues.tex" in text
+    assert "conclusion\\endcsname" not in text
+    assert "draft" not in text
+    assert text.index("End of preview settings") < text.index("\\begin{document}")
@@ -0,0 +1,21 @@
+import json
+from reporter import profiling
+
+
+def test_profiling(tmp_path):
+    with profiling.phase("disabled"):
+        pass
+    profiler = profiling.enable()
+    try:
+        with profiling.phase("outer"):
+            with profiling.phase("inner"):
+                pass
+    finally:
+        profiling.disable()
+    with profiling.phase("disabled"):
+        pass
+    assert [record["name"] for record in profiler.records] == ["outer", "outer > inner"]
+    assert "  inner" in profiler.summary()
+    path, = profiler.save(str(tmp_path))
+    with open(path) as f:
+        assert json.load(f)["phases"][1]["depth"] == 1
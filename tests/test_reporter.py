@@ -0,0 +1,146 @@
+import os
+import subprocess
+import pytest
+from reporter.config import config
+from reporter.reporter import Template, Reporter
+from test_issues import create_issue_dir
+
+
+def create_report(root):
+    os.makedirs(os.path.join(root, "issues"))
+    create_issue_dir(os.path.join(root, "issues"), "first issue")
+    create_issue_dir(os.path.join(root, "issues"), "second", cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N")
+
+
+def get_reporter(root):
+    template = Template()
+    return template.reporter_class(template, report_dir=root)
+
+
+def render_issue_fragments(reporter):
+    template_dirs = [reporter.root] + [t.REPORT_TEMPLATE_DIR for t in reporter.template.inheritance_tree]
+    os.makedirs(reporter.output_dir, exist_ok=True)
+    return reporter.render_issue_fragments(reporter.content, template_dirs)
+
+
+def test_issue_fragments(tmp_path):
+    root = str(tmp_path)
+    create_report(root)
+    reporter = get_reporter(root)
+    findings_dir = os.path.join(reporter.output_dir, "findings")
+    assert sorted(render_issue_fragments(reporter)) == [
+        os.path.join(findings_dir, "first-issue.tex"),
+        os.path.join(findings_dir, "second.tex"),
+    ]
+    with open(os.path.join(findings_dir, "second.tex")) as f:
+        assert r"\begin{issue}{ second }{1}" in f.read()
+
+    # Only the fragment of the changed issue is written
+    create_issue_dir(os.path.join(root, "issues"), "first issue", locations=["otherhost"])
+    assert render_issue_fragments(get_reporter(root)) == [os.path.join(findings_dir, "first-issue.tex")]
+
+
+def test_language_reporters_share_loaded_issues(tmp_path):
+    root = str(tmp_path)
+    create_report(root)
+    reporter = get_reporter(root)
+    issues = list(reporter.get_issues())
+    language_reporter = reporter.language_reporter("en", issues)
+    assert language_reporter.output_dir == reporter.output_dir + "-en"
+    assert language_reporter.language_output_file("en") == os.path.join(root, "report_en.pdf")
+
+    # Each language gets its own copies, so processing one language does not affect another
+    copies = list(language_reporter.get_issues())
+    assert [issue.title for issue in copies] == [issue.title for issue in issues]
+    copies[0].number = 10
+    assert not hasattr(issues[0], "number")
+
+
+def fake_make(reporter, returncode, calls):
+    def run_make(env, stdout=None, targets=[]):
+        calls.append(returncode)
+        if returncode == 0:
+            with open(reporter.output_file, 'w') as f:
+                f.write("pdf")
+        return subprocess.CompletedProcess(['make'], returncode)
+    reporter.run_make = run_make
+
+
+def test_failed_build_is_not_up_to_date(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, 'title', "Title")
+    monkeypatch.setitem(config, 'company_name', "Company")
+    root = str(tmp_path)
+    create_report(root)
+    calls = []
+    reporter = get_reporter(root)
+    fake_make(reporter, 0, calls)
+    reporter.generate()
+    assert calls == [0]
+
+    # Nothing changed
+    reporter = get_reporter(root)
+    fake_make(reporter, 0, calls)
+    reporter.generate()
+    assert calls == [0]
+
+    # The rendered output changes, but compiling it fails
+    with open(os.path.join(root, "appendix.tex"), 'w') as f:
+        f.write("Appendix")
+    reporter = get_reporter(root)
+    fake_make(reporter, 1, calls)
+    with pytest.raises(subprocess.CalledProcessError):
+        reporter.generate()
+    assert calls == [0, 1]
+
+    # The output did not change since the failed build, but the report must still be compiled
+    reporter = get_reporter(root)
+    fake_make(reporter, 0, calls)
+    reporter.generate()
+    assert calls == [0, 1, 0]
+
+
+def test_failed_language_does_not_abort_other_languages(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, 'title', "Title")
+    monkeypatch.setitem(config, 'company_name', "Company")
+    root = str(tmp_path)
+    create_report(root)
+
+    def run_make(self, env, stdout=None, targets=[]):
+        if self.output_dir.endswith("-nl"):
+            raise FileNotFoundError("make")
+        with open(self.output_file, 'w') as f:
+            f.write("pdf")
+        return subprocess.CompletedProcess(['make'], 0)
+    monkeypatch.setattr(Reporter, "run_make", run_make)
+    # The default template only has English static content
+    load_static_content = Template.load_static_content
+    monkeypatch.setattr(Template, "load_static_content", lambda self: load_static_content(Template(self.name, "en")))
+
+    results = get_reporter(root).generate_languages(["en", "nl"])
+    assert results["en"] == os.path.join(root, "report_en.pdf")
+    assert isinstance(results["nl"], FileNotFoundError) and str(results["nl"]) == "make"
+
+
+def test_preview_keeps_issue_numbers(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, 'title', "Title")
+    monkeypatch.setitem(config, 'company_name', "Company")
+    root = str(tmp_path)
+    create_report(root)
+    create_issue_dir(os.path.join(root, "issues"), "third", cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:L/A:N")
+    with open(os.path.join(root, "report.tex"), 'w') as f:
+        f.write("\\documentclass{pentest}\n\\begin{document}\n\\input{issues.tex}\n\\input{conclusion.tex}\n\\end{document}\n")
+    reporter = get_reporter(root)
+    reporter.generate(preprocess_only=True)
+    with open(os.path.join(reporter.output_dir, "findings", "third.tex")) as f:
+        full = f.read()
+    assert r"\begin{issue}{ third }{2}" in full
+
+    # Unknown selectors are reported before anything is rendered
+    with pytest.raises(Exception, match="Unknown issue, severity or section: thrid"):
+        get_reporter(root).preview(["thrid"], preprocess_only=True)
+    assert not os.path.exists(reporter.output_dir + "-preview")
+
+    output_dir = get_reporter(root).preview(["third", "conclusion"], preprocess_only=True)
+    assert os.listdir(os.path.join(output_dir, "findings")) == ["third.tex"]
+    with open(os.path.join(output_dir, "findings", "third.tex")) as f:
+        assert f.read() == full
@@ -0,0 +1,39 @@
+import json
+import socket
+from reporter.reporter import Template
+from reporter.server import Server
+from reporter.client import STATUS_SEPARATOR
+
+
+def request(argv, cwd, server=None):
+    server_conn, client_conn = socket.socketpair()
+    client_conn.sendall(json.dumps({"argv": argv, "cwd": str(cwd)}).encode() + b"\n")
+    with server_conn:
+        (server or Server(Template(), None)).handle(server_conn)
+    output = b""
+    with client_conn:
+        while chunk := client_conn.recv(65536):
+            output += chunk
+    output, _, status = output.partition(STATUS_SEPARATOR)
+    return output.decode(), json.loads(status)['status']
+
+
+def test_server_handles_commands(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "issues").mkdir()
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "screenshot.png").write_bytes(b"")
+    assert request(["images"], tmp_path) == ("screenshot.png\n", 0)
+    output, status = request(["init", "new_report"], tmp_path)
+    assert status == 1
+    assert "not supported" in output
+
+
+def test_request_arguments_do_not_leak(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "issues").mkdir()
+    server = Server(Template(), None)
+    output, status = request(["generate", "--format", "csv", "-o", "-", "--shared-cache-dir", str(tmp_path / "shared"), "-l", "nl", "-j", "3"], tmp_path, server)
+    assert status == 0
+    assert server.template.reporter_args == {}
+    assert server.template.language == Template().language
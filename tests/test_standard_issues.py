@@ -0,0 +1,56 @@
+import os
+import pytest
+from reporter.standard_issues import StandardIssueIndex
+from test_issues import ISSUE
+
+
+def write_standard_issue(library_dir, filename, title):
+    with open(os.path.join(library_dir, filename), 'w') as f:
+        f.write(ISSUE.format(title=title, cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N"))
+
+
+def test_standard_issue_index(tmp_path):
+    library_dir = str(tmp_path / "library")
+    index_file = str(tmp_path / "cache" / "index.pickle")
+    os.makedirs(library_dir)
+    write_standard_issue(library_dir, "en_xss.issue", "Cross-site scripting")
+    write_standard_issue(library_dir, "nl_xss.issue", "Cross-site scripting (nl)")
+    write_standard_issue(library_dir, "notes.txt", "Not an issue")
+
+    index = StandardIssueIndex(index_file, library_dir).update()
+    assert index.paths() == ["en_xss.issue", "nl_xss.issue"]
+    assert index.entries["nl_xss.issue"]['language'] == "nl"
+    assert index.by_title()["Cross-site scripting"].path == os.path.join(library_dir, "en_xss.issue")
+
+    write_standard_issue(library_dir, "en_xss.issue", "Reflected cross-site scripting")
+    os.remove(os.path.join(library_dir, "nl_xss.issue"))
+    index = StandardIssueIndex(index_file, library_dir).update()
+    assert index.paths() == ["en_xss.issue"]
+    assert list(index.by_title()) == ["Reflected cross-site scripting"]
+
+
+def test_invalid_standard_issue_is_skipped(tmp_path):
+    library_dir = str(tmp_path / "library")
+    os.makedirs(library_dir)
+    write_standard_issue(library_dir, "en_xss.issue", "Cross-site scripting")
+    with open(os.path.join(library_dir, "en_broken.issue"), 'w') as f:
+        f.write("#[Title]#\nBroken\n")
+
+    index = StandardIssueIndex(str(tmp_path / "index.pickle"), library_dir).update()
+    assert index.paths() == ["en_broken.issue", "en_xss.issue"]
+    assert index.entries["en_broken.issue"]['error']
+    assert list(index.by_title()) == ["Cross-site scripting"]
+
+
+def test_standard_issue_with_new_mtime_is_not_parsed_again(tmp_path, monkeypatch):
+    library_dir = str(tmp_path / "library")
+    index_file = str(tmp_path / "index.pickle")
+    os.makedirs(library_dir)
+    write_standard_issue(library_dir, "en_xss.issue", "Cross-site scripting")
+    StandardIssueIndex(index_file, library_dir).update()
+
+    os.utime(os.path.join(library_dir, "en_xss.issue"), ns=(0, 0))
+    monkeypatch.setattr(StandardIssueIndex, "load_entry", lambda *args: pytest.fail("parsed again"))
+    index = StandardIssueIndex(index_file, library_dir).update()
+    assert index.entries["en_xss.issue"]['mtime'] == 0
+    assert list(index.by_title()) == ["Cross-site scripting"]
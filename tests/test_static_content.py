@@ -0,0 +1,31 @@
+import os
+from reporter.static_content import StaticContentSnapshot
+
+
+def test_snapshot_is_reused_until_a_source_changes(tmp_path):
+    source = str(tmp_path / "en.yaml")
+    missing = str(tmp_path / "general.yaml")
+    with open(source, 'w') as f:
+        f.write("a: 1\n")
+    snapshot = StaticContentSnapshot(str(tmp_path / "cache" / "static_content.pickle"))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"loads": len(loads)}
+
+    assert snapshot.load([source, missing], loader) == {"loads": 1}
+    assert snapshot.load([source, missing], loader) == {"loads": 1}
+
+    # Touching a file without changing its content keeps the snapshot
+    os.utime(source, ns=(0, 0))
+    assert snapshot.load([source, missing], loader) == {"loads": 1}
+
+    with open(source, 'w') as f:
+        f.write("a: 2\n")
+    assert snapshot.load([source, missing], loader) == {"loads": 2}
+
+    with open(missing, 'w') as f:
+        f.write("b: 1\n")
+    assert snapshot.load([source, missing], loader) == {"loads": 3}
+    assert snapshot.load([source], loader) == {"loads": 4}
@@ -0,0 +1,31 @@
+import sys
+from reporter.reporter import Template, Reporter
+
+REPORTER_LIB = """
+from reporter.reporter import Reporter as BaseReporter
+loaded = globals().get('loaded', 0) + 1
+
+class Reporter(BaseReporter):
+    pass
+"""
+
+
+def test_override_modules_are_loaded_once(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    for template_dir in [first, second]:
+        template_dir.mkdir()
+        (template_dir / "reporter.py").write_text(REPORTER_LIB)
+    first_template = Template(str(first))
+    second_template = Template(str(second))
+
+    reporter_class = first_template.reporter_class
+    assert issubclass(reporter_class, Reporter)
+    assert first_template.reporter_class is reporter_class
+    assert Template(str(first)).reporter_class is reporter_class
+    assert sys.modules[reporter_class.__module__].loaded == 1
+
+    # Templates do not overwrite each others modules
+    assert second_template.reporter_class is not reporter_class
+    assert reporter_class.__module__ != second_template.reporter_class.__module__
+    assert sys.modules[reporter_class.__module__].Reporter is reporter_class
@@ -0,0 +1,189 @@
+import os
+import pytest
+from reporter.util import template, unified_diff, get_latex_env, SyncManifest, cascade_map, scan_directory
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_template_only_writes_changed_files(tmp_path):
+    template_dir = str(tmp_path / "template")
+    output_dir = str(tmp_path / "output")
+    manifest = str(tmp_path / "manifest.json")
+    os.makedirs(output_dir)
+    write(os.path.join(template_dir, "a.tex"), r"\VAR{a}")
+    write(os.path.join(template_dir, "b.tex"), r"\VAR{b}")
+
+    written = template({"a": 1, "b": 2}, output_dir, [template_dir], manifest=manifest)
+    assert sorted(map(os.path.basename, written)) == ["a.tex", "b.tex"]
+
+    written = template({"a": 1, "b": 2}, output_dir, [template_dir], manifest=manifest)
+    assert written == []
+
+    written = template({"a": 1, "b": 3}, output_dir, [template_dir], manifest=manifest)
+    assert list(map(os.path.basename, written)) == ["b.tex"]
+    with open(os.path.join(output_dir, "b.tex")) as f:
+        assert f.read() == "3"
+
+
+def test_template_rewrites_deleted_output(tmp_path):
+    template_dir = str(tmp_path / "template")
+    output_dir = str(tmp_path / "output")
+    manifest = str(tmp_path / "manifest.json")
+    os.makedirs(output_dir)
+    write(os.path.join(template_dir, "a.tex"), r"\VAR{a}")
+
+    template({"a": 1}, output_dir, [template_dir], manifest=manifest)
+    os.remove(os.path.join(output_dir, "a.tex"))
+    written = template({"a": 1}, output_dir, [template_dir], manifest=manifest)
+    assert list(map(os.path.basename, written)) == ["a.tex"]
+
+
+def test_unified_diff_ignores_whitespace(tmp_path):
+    a = str(tmp_path / "a")
+    b = str(tmp_path / "b")
+    write(a, "one\ntwo  words\nthree\n")
+    write(b, "one\ntwo words\n3\n")
+    diff = unified_diff(a, b)
+    assert "-three\n+3\n" in diff
+    assert "-two" not in diff
+    assert unified_diff(a, a) == ""
+    assert "\033[31m-three" in unified_diff(a, b, color=True)
+
+
+def test_sync_only_copies_changed_files(tmp_path):
+    child = str(tmp_path / "child")
+    parent = str(tmp_path / "parent")
+    output_dir = str(tmp_path / "output")
+    manifest = SyncManifest(str(tmp_path / "synced.json"))
+    write(os.path.join(child, "a.png"), "child")
+    write(os.path.join(parent, "a.png"), "parent")
+    write(os.path.join(parent, "sub", "b.png"), "b")
+
+    changed = manifest.sync([child, parent], output_dir)
+    assert sorted(os.path.relpath(path, output_dir) for path in changed) == ["a.png", os.path.join("sub", "b.png")]
+    with open(os.path.join(output_dir, "a.png")) as f:
+        assert f.read() == "child"
+
+    assert manifest.sync([child, parent], output_dir) == []
+
+    write(os.path.join(parent, "sub", "b.png"), "changed")
+    assert manifest.sync([child, parent], output_dir) == [os.path.join(output_dir, "sub", "b.png")]
+
+
+def test_sync_removes_deleted_files(tmp_path):
+    src = str(tmp_path / "src")
+    output_dir = str(tmp_path / "output")
+    write(os.path.join(src, "a.sty"), "a")
+    write(os.path.join(src, "b.sty"), "b")
+    write(os.path.join(output_dir, "generated.tex"), "not synced")
+    manifest = SyncManifest(str(tmp_path / "synced.json"))
+    manifest.sync([src], output_dir)
+    manifest.save()
+
+    os.remove(os.path.join(src, "b.sty"))
+    manifest = SyncManifest(str(tmp_path / "synced.json"))
+    assert manifest.sync([src], output_dir) == [os.path.join(output_dir, "b.sty")]
+    assert sorted(os.listdir(output_dir)) == ["a.sty", "generated.tex"]
+
+
+def test_sync_keeps_files_of_other_sources(tmp_path):
+    first = str(tmp_path / "first")
+    second = str(tmp_path / "second")
+    output_dir = str(tmp_path / "output")
+    write(os.path.join(first, "a.sty"), "a")
+    write(os.path.join(second, "b.sty"), "b")
+    manifest = SyncManifest(str(tmp_path / "synced.json"))
+    manifest.sync([first], output_dir)
+    manifest.sync([second], output_dir)
+    manifest.save()
+    assert sorted(os.listdir(output_dir)) == ["a.sty", "b.sty"]
+
+    os.remove(os.path.join(second, "b.sty"))
+    manifest = SyncManifest(str(tmp_path / "synced.json"))
+    assert manifest.sync([first], output_dir) == []
+    assert manifest.sync([second], output_dir) == [os.path.join(output_dir, "b.sty")]
+    assert os.listdir(output_dir) == ["a.sty"]
+
+
+def test_scan_directory_prunes_excluded_dirs(tmp_path):
+    write(str(tmp_path / "a.tex"), "")
+    write(str(tmp_path / ".git" / "objects" / "x"), "")
+    write(str(tmp_path / "sub" / "b.tex"), "")
+    write(str(tmp_path / "sub_appendix" / "c.tex"), "")
+    listing, mtimes = scan_directory(str(tmp_path), excluded=[".git", "sub/"])
+    assert [(relpath, fnames) for relpath, _, fnames in listing] == [(".", ["a.tex"]), ("sub_appendix", ["c.tex"])]
+    assert str(tmp_path / ".git") not in mtimes
+
+
+def test_cascade_map_is_updated_when_directories_change(tmp_path):
+    child = str(tmp_path / "child")
+    parent = str(tmp_path / "parent")
+    write(os.path.join(child, "a.tex"), "")
+    write(os.path.join(parent, "a.tex"), "")
+    write(os.path.join(parent, "sub", "b.tex"), "")
+    # Old mtimes, so the scan is cached
+    for dirpath in [child, parent, os.path.join(parent, "sub")]:
+        os.utime(dirpath, (0, 0))
+
+    files = cascade_map([child, parent])
+    assert {path: f.dir for path, f in files.items()} == {"a.tex": child, os.path.join("sub", "b.tex"): parent}
+    assert cascade_map([child, parent]) is files
+
+    write(os.path.join(child, "sub", "b.tex"), "")
+    assert cascade_map([child, parent])[os.path.join("sub", "b.tex")].dir == child
+
+
+def test_template_keeps_output_when_rendering_fails(tmp_path):
+    template_dir = str(tmp_path / "template")
+    output_dir = str(tmp_path / "output")
+    os.makedirs(output_dir)
+    write(os.path.join(template_dir, "a.tex"), r"\BLOCK{for line in lines}\VAR{line.upper()}\BLOCK{endfor}")
+    template({"lines": ["x"] * 100000}, output_dir, [template_dir])
+    with open(os.path.join(output_dir, "a.tex")) as f:
+        assert f.read() == "X" * 100000
+
+    with pytest.raises(Exception):
+        template({"lines": ["y"] * 100000 + [None]}, output_dir, [template_dir])
+    with open(os.path.join(output_dir, "a.tex")) as f:
+        assert f.read() == "X" * 100000
+    assert os.listdir(output_dir) == ["a.tex"]
+
+
+def test_template_reuses_compiled_templates(tmp_path):
+    template_dir = str(tmp_path / "template")
+    output_dir = str(tmp_path / "output")
+    bytecode_cache = str(tmp_path / "jinja")
+    os.makedirs(output_dir)
+    write(os.path.join(template_dir, "a.tex"), r"\VAR{a}")
+
+    template({"a": 1}, output_dir, [template_dir], bytecode_cache=bytecode_cache)
+    cached, = [os.path.join(bytecode_cache, f) for f in os.listdir(bytecode_cache)]
+    env = get_latex_env(template_dir, bytecode_cache)
+    # Templates are loaded by their path relative to the template dir
+    name = os.path.join(".", "a.tex")
+    compiled = env.get_template(name)
+    os.utime(cached, ns=(0, 0))
+
+    # The environment of the process is shared, so the template is not compiled again
+    template({"a": 2}, output_dir, [template_dir], bytecode_cache=bytecode_cache)
+    assert get_latex_env(template_dir, bytecode_cache) is env
+    assert env.get_template(name) is compiled
+
+    # A new process loads the compiled template from the bytecode cache
+    get_latex_env.cache_clear()
+    template({"a": 3}, output_dir, [template_dir], bytecode_cache=bytecode_cache)
+    assert os.stat(cached).st_mtime_ns == 0
+    with open(os.path.join(output_dir, "a.tex")) as f:
+        assert f.read() == "3"
+
+    # Editing the source invalidates the compiled template
+    get_latex_env.cache_clear()
+    write(os.path.join(template_dir, "a.tex"), r"a = \VAR{a}")
+    template({"a": 4}, output_dir, [template_dir], bytecode_cache=bytecode_cache)
+    assert os.stat(cached).st_mtime_ns != 0
+    with open(os.path.join(output_dir, "a.tex")) as f:
+        assert f.read() == "a = 4"
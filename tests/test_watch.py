@@ -0,0 +1,39 @@
+import os
+import threading
+import time
+from reporter.watch import snapshot, watch
+
+
+def test_snapshot(tmp_path):
+    os.makedirs(tmp_path / "sub")
+    for path in ["report.tex", "report.pdf", "sub/issue.dradis"]:
+        (tmp_path / path).write_text("content")
+    state = snapshot([(str(tmp_path), False, [".tex"])])
+    assert list(state) == [str(tmp_path / "report.tex")]
+    state = snapshot([(str(tmp_path), True, None)])
+    assert len(state) == 3
+    (tmp_path / "report.tex").write_text("changed content")
+    assert snapshot([(str(tmp_path), True, None)]) != state
+
+
+def test_watch_new_empty_directory(tmp_path):
+    changes = []
+
+    def callback(changed):
+        changes.append(changed)
+        raise KeyboardInterrupt
+
+    def run():
+        try:
+            watch([(str(tmp_path), True, None)], callback, debounce=0.1)
+        except KeyboardInterrupt:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    time.sleep(0.3)
+    os.makedirs(tmp_path / "new")
+    time.sleep(0.5)
+    (tmp_path / "new" / "issue.dradis").write_text("content")
+    thread.join(timeout=5)
+    assert changes == [{str(tmp_path / "new" / "issue.dradis")}]